@@ -7,9 +7,11 @@ def create_extension():
     try:
       extension1 = text("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
       extension2 = text("CREATE EXTENSION IF NOT EXISTS unaccent;")
+      extension3 = text("CREATE EXTENSION IF NOT EXISTS btree_gist;")
 
       db.execute(extension1)
       db.execute(extension2)
+      db.execute(extension3)
       
       db.commit()
       
@@ -2141,6 +2143,140 @@ def users_search_text():
     finally:
         db.close()
 
+#---------------------------------------------------------------------------------------------------------------------------------------
+
+def bookings_stay_range_exclusion():
+    from sqlalchemy.schema import AddConstraint
+    from app.models.bookings import Bookings
+
+    db = SessionLocal()
+    try:
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist;"))
+
+        # Drop old objects
+        db.execute(text("""
+        ALTER TABLE bookings DROP CONSTRAINT IF EXISTS exclude_overlapping_room_bookings;
+        """))
+        db.execute(text("""
+        ALTER TABLE bookings DROP COLUMN IF EXISTS stay_range;
+        """))
+        db.commit()
+
+        print("Old stay_range column and exclusion constraint dropped successfully.")
+
+        # Generated half-open date range for every booking
+        db.execute(text("""
+        ALTER TABLE bookings
+        ADD COLUMN stay_range daterange
+        GENERATED ALWAYS AS (daterange(check_in, check_out, '[)')) STORED;
+        """))
+
+        # Exclusion constraint (and its GiST index) compiled from the model definition
+        exclusion = next(
+            c for c in Bookings.__table__.constraints
+            if c.name == "exclude_overlapping_room_bookings"
+        )
+        db.execute(AddConstraint(exclusion))
+        db.commit()
+
+        print("stay_range column and exclusion constraint created successfully!")
+
+    except Exception as e:
+        db.rollback()
+        print("Error while altering bookings (overlapping confirmed bookings must be resolved first):", e)
+
+    finally:
+        db.close()
+
+def bookings_pending_holds():
+    from sqlalchemy.schema import AddConstraint, CreateIndex
+    from app.models.bookings import Bookings
+
+    db = SessionLocal()
+    try:
+        db.execute(text("""
+        ALTER TABLE bookings ADD COLUMN IF NOT EXISTS hold_expires_at TIMESTAMP WITH TIME ZONE;
+        """))
+
+        # PENDING holds now occupy rooms too: rebuild the constraint from the model
+        db.execute(text("""
+        ALTER TABLE bookings DROP CONSTRAINT IF EXISTS exclude_overlapping_room_bookings;
+        """))
+        exclusion = next(
+            c for c in Bookings.__table__.constraints
+            if c.name == "exclude_overlapping_room_bookings"
+        )
+        db.execute(AddConstraint(exclusion))
+
+        db.execute(text("""
+        DROP INDEX IF EXISTS ix_bookings_pending_hold_expiry;
+        """))
+        hold_index = next(i for i in Bookings.__table__.indexes if i.name == "ix_bookings_pending_hold_expiry")
+        db.execute(CreateIndex(hold_index))
+        db.commit()
+
+        print("hold_expires_at column, exclusion constraint and hold index created successfully!")
+
+    except Exception as e:
+        db.rollback()
+        print("Error while altering bookings (overlapping pending/confirmed bookings must be resolved first):", e)
+
+    finally:
+        db.close()
+
+def table_change_notifications():
+    # The app installs these on startup too; this covers every table any worker subscribes to
+    from app.core.table_listener import install_change_triggers
+    from app.services.availability_index import AVAILABILITY_INDEX_TABLES
+    from app.services.price_calendar import PRICE_CALENDAR_TABLES
+    from app.services.rate_engine import RATE_ENGINE_TABLES
+    from app.services.room_type_index import ROOM_TYPE_INDEX_TABLES
+    from app.services.search_cache import WATCHED_TABLES
+    from app.services.suggest_index import SUGGEST_SOURCES
+
+    tables = set().union(WATCHED_TABLES, ROOM_TYPE_INDEX_TABLES, RATE_ENGINE_TABLES, AVAILABILITY_INDEX_TABLES, PRICE_CALENDAR_TABLES, SUGGEST_SOURCES)
+    try:
+        install_change_triggers(tables)
+        print("Change notification triggers created on:", ", ".join(sorted(tables)))
+
+    except Exception as e:
+        print("Error while creating change notification triggers:", e)
+
+def ratings_reviews_rating_column():
+    from bson import ObjectId
+    from pymongo import MongoClient
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    db = SessionLocal()
+    mongo = MongoClient(settings.MONGO_URL, serverSelectionTimeoutMS=5000)
+    try:
+        db.execute(text("""
+        ALTER TABLE ratings_reviews ADD COLUMN IF NOT EXISTS ratings INTEGER;
+        """))
+
+        # Backfill from the Mongo documents the rows point at
+        rows = db.execute(text("SELECT id, odject_id FROM ratings_reviews WHERE ratings IS NULL;")).all()
+        row_by_object = {ObjectId(object_id): row_id for row_id, object_id in rows if ObjectId.is_valid(object_id)}
+        updates = [
+            {"id": row_by_object[doc["_id"]], "ratings": doc["ratings"]}
+            for doc in mongo[settings.MONGO_DB]["ratings_reviews"].find({"_id": {"$in": list(row_by_object)}}, {"ratings": 1})
+            if doc.get("ratings") is not None
+        ]
+        if updates:
+            db.execute(text("UPDATE ratings_reviews SET ratings = :ratings WHERE id = :id;"), updates)
+        db.commit()
+
+        print(f"ratings column added, {len(updates)} ratings backfilled from Mongo")
+
+    except Exception as e:
+        db.rollback()
+        print("Error while adding ratings_reviews.ratings:", e)
+
+    finally:
+        mongo.close()
+        db.close()
+
 def check_and_enable_trigram():
     db = SessionLocal()
     try:
@@ -2189,6 +2325,10 @@ if __name__ == "__main__":
     # bed_types_search_text()
     # users_search_vector()
     # users_search_text()
+    # bookings_stay_range_exclusion()
+    # bookings_pending_holds()
+    # table_change_notifications()
+    # ratings_reviews_rating_column()
     check_and_enable_trigram()
     
     
@@ -0,0 +1,29 @@
+# app/core/background.py
+import asyncio
+import logging
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+_tasks: list = []
+
+
+def start_periodic(name: str, interval_seconds: float, func):
+    """Run blocking `func` in the threadpool every `interval_seconds` until shutdown"""
+
+    async def runner():
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await run_in_threadpool(func)
+            except Exception as e:
+                logger.warning("Background task %s failed: %s", name, e)
+
+    _tasks.append(asyncio.get_running_loop().create_task(runner(), name=name))
+
+
+async def stop_all():
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -9,6 +9,89 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_HOST: str
     POSTGRES_PORT: str
+    POSTGRES_ASYNC: bool = False
+
+    # PostgreSQL connection pool (per engine, per worker)
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+    POSTGRES_POOL_TIMEOUT: int = 30
+
+    # PostgreSQL read replica (read-only endpoints)
+    POSTGRES_REPLICA_HOST: Optional[str] = None
+    POSTGRES_REPLICA_PORT: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 5.0
+
+    # Per-request SQL instrumentation
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_QUERY_BUDGET: int = 20
+    SQL_LATENCY_BUDGET_MS: float = 500
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Slow-query log with EXPLAIN capture
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = 300
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 200
+    SLOW_QUERY_MAX_SAMPLES: int = 500
+
+    # In-memory room availability index
+    AVAILABILITY_INDEX_ENABLED: bool = True
+    AVAILABILITY_INDEX_HORIZON_DAYS: int = 400
+    AVAILABILITY_INDEX_REFRESH_SECONDS: int = 300
+
+    # Rate engine (dense nightly rates per room type)
+    RATE_ENGINE_HORIZON_DAYS: int = 400
+    RATE_ENGINE_REFRESH_SECONDS: int = 300
+    PRICE_CALENDAR_CACHE_SECONDS: int = 600
+
+    # Timed inventory holds (PENDING bookings)
+    BOOKING_HOLD_TTL_MINUTES: int = 15
+    BOOKING_HOLD_REAPER_INTERVAL_SECONDS: int = 60
+    BOOKING_HOLD_REAPER_BATCH_SIZE: int = 500
+
+    # Idempotency-Key replay window for booking / cancellation
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS: int = 3600
+
+    # Search ranking ("hybrid" blends full-text and trigram scores in one query, "cascade" tries FTS -> trigram -> ILIKE)
+    SEARCH_DEFAULT_MODE: str = "hybrid"
+    SEARCH_FTS_WEIGHT: float = 0.7
+    SEARCH_TRIGRAM_WEIGHT: float = 0.3
+
+    # Trigram word_similarity thresholds per searched table. Every connection sets
+    # pg_trgm thresholds to the lowest once, on connect; each table rechecks its own
+    SEARCH_TRIGRAM_DEFAULT_THRESHOLD: float = 0.5
+    SEARCH_TRIGRAM_THRESHOLDS: Dict[str, float] = {
+        "rooms": 0.4,
+        "room_type_with_sizes": 0.4,
+        "features": 0.5,
+        "addons": 0.5,
+        "bed_types": 0.5,
+        "floors": 0.6,
+        "bookings": 0.5,
+        "users": 0.6,
+    }
+
+    # Cross-entity /search fan-out
+    SEARCH_ENTITIES: str = "rooms,room_types,floors,features,addons,bed_types,bookings,users"
+    SEARCH_DEADLINE_MS: int = 800
+    SEARCH_MAX_CONCURRENCY: int = 6
+
+    # Table change notifications (LISTEN/NOTIFY): in-process indexes rebuild on the next sync after a change
+    TABLE_CHANGE_SYNC_SECONDS: int = 2
+    ROOM_TYPE_INDEX_REFRESH_SECONDS: int = 300
+
+    # Search result cache (evicted by LISTEN/NOTIFY on table changes)
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_MAX_ENTRIES: int = 1000
+    SEARCH_CACHE_TTL_SECONDS: int = 300
+
+    # Typeahead prefix index (changed tables re-read every sync, full rebuild for popularity)
+    SUGGEST_INDEX_SYNC_SECONDS: int = 2
+    SUGGEST_INDEX_REFRESH_SECONDS: int = 3600
 
     # MongoDB
     MONGO_URL: str
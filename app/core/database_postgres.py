@@ -1,8 +1,15 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import get_settings
+from app.core.pool_monitor import InstrumentedQueuePool, InstrumentedAsyncQueuePool
 
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
 DATABASE_URL = (
@@ -10,15 +17,144 @@ DATABASE_URL = (
     f"{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 )
 
-engine = create_engine(DATABASE_URL)
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+POOL_OPTIONS = {
+    "pool_size": settings.POSTGRES_POOL_SIZE,
+    "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+    "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+    "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+    "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+}
+
+# Loosest per-table trigram threshold: the GIN index prunes to it, search rechecks each table's own
+TRIGRAM_SESSION_THRESHOLD = min([settings.SEARCH_TRIGRAM_DEFAULT_THRESHOLD, *settings.SEARCH_TRIGRAM_THRESHOLDS.values()])
+
+
+@event.listens_for(Engine, "connect")
+def set_trigram_thresholds(dbapi_connection, connection_record):
+    """Once per pooled connection instead of set_limit() on every search"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"SET pg_trgm.similarity_threshold = {float(TRIGRAM_SESSION_THRESHOLD)}")
+        cursor.execute(f"SET pg_trgm.word_similarity_threshold = {float(TRIGRAM_SESSION_THRESHOLD)}")
+        # Committed so the pool's reset-on-return rollback does not undo it
+        dbapi_connection.commit()
+    except Exception as e:
+        dbapi_connection.rollback()
+        logger.warning("Could not set pg_trgm thresholds on connect: %s", e)
+    finally:
+        cursor.close()
+
+
+engine = create_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, **POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine (asyncpg) - only built when POSTGRES_ASYNC is enabled
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.POSTGRES_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        **POOL_OPTIONS
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+# Read replica - only built when POSTGRES_REPLICA_HOST is set
+REPLICA_DATABASE_URL = None
+replica_engine = None
+ReplicaSessionLocal = None
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+
+if settings.POSTGRES_REPLICA_HOST:
+    REPLICA_DATABASE_URL = (
+        f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@"
+        f"{settings.POSTGRES_REPLICA_HOST}:{settings.POSTGRES_REPLICA_PORT or settings.POSTGRES_PORT}/"
+        f"{settings.POSTGRES_DB}"
+    )
+    replica_engine = create_engine(
+        REPLICA_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        execution_options={"postgresql_readonly": True},
+        **POOL_OPTIONS
+    )
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+    if settings.POSTGRES_ASYNC:
+        async_replica_engine = create_async_engine(
+            REPLICA_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+            poolclass=InstrumentedAsyncQueuePool,
+            execution_options={"postgresql_readonly": True},
+            **POOL_OPTIONS
+        )
+        AsyncReplicaSessionLocal = async_sessionmaker(
+            bind=async_replica_engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+
+
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaHealth:
+    """Cached replica lag, re-probed at most once per check interval."""
+
+    def __init__(self, max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_stale(self):
+        return time.monotonic() - self.checked_at >= self.check_interval
+
+    def probe(self):
+        with self._lock:
+            if not self.is_stale():
+                return
+            try:
+                with replica_engine.connect() as conn:
+                    self.lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+            except Exception as e:
+                logger.warning("Replica lag probe failed, routing reads to primary: %s", e)
+                self.lag = None
+            self.checked_at = time.monotonic()
+
+    def usable(self):
+        return self.lag is not None and self.lag <= self.max_lag
+
+
+replica_health = ReplicaHealth(
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS
+)
+
 def init_db():
     from app.models.role import Roles
     
     
     print("Starting database initialization...")
+    # Bookings' exclusion constraint combines "room_id WITH =" and a daterange in one GiST index
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist;"))
     Base.metadata.create_all(bind=engine)
     print("Created all tables")
 
@@ -52,4 +188,4 @@ def init_db():
         db.close()
        
         
-        
\ No newline at end of file
+        
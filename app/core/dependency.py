@@ -1,9 +1,18 @@
-from app.core.database_postgres import SessionLocal
+from app.core.database_postgres import (
+    SessionLocal,
+    AsyncSessionLocal,
+    ReplicaSessionLocal,
+    AsyncReplicaSessionLocal,
+    replica_health
+)
 from app.auth.jwt_bearer import JWTBearer 
 from app.models.user import Users
+from app.models.role import Roles
+from app.crud.generic_crud import get_record_by_id
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
 
 
 
@@ -16,11 +25,54 @@ def get_db():
     
     finally:
         db.close()
+
+
+async def _get_async_session():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# AsyncSession when POSTGRES_ASYNC is enabled, otherwise the same sync session as get_db
+get_async_db = _get_async_session if AsyncSessionLocal is not None else get_db
+
+
+def read_session_factory():
+    """Sync session factory for reads: replica when healthy, primary otherwise"""
+    if ReplicaSessionLocal is not None:
+        if replica_health.is_stale():
+            replica_health.probe()
+        if replica_health.usable():
+            return ReplicaSessionLocal
+    return SessionLocal
+
+
+def get_read_db():
+    """Session for read-only handlers: replica when healthy, primary otherwise"""
+    db = read_session_factory()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def _get_async_read_session():
+    session_factory = AsyncSessionLocal
+    if AsyncReplicaSessionLocal is not None:
+        if replica_health.is_stale():
+            await run_in_threadpool(replica_health.probe)
+        if replica_health.usable():
+            session_factory = AsyncReplicaSessionLocal
+
+    async with session_factory() as db:
+        yield db
+
+
+get_async_read_db = _get_async_read_session if AsyncSessionLocal is not None else get_read_db
         
 
-def get_current_user(user_id: int = Depends(jwt_bearer),db:Session = Depends(get_db)):
+async def get_current_user(user_id: int = Depends(jwt_bearer),db:Session = Depends(get_async_db)):
     
-    user = db.query(Users).filter(Users.id == user_id).first()
+    user = await get_record_by_id(id=int(user_id), model=Users, db=db, profile="auth")
     
     if user is None:
         raise HTTPException(
@@ -29,4 +81,20 @@ def get_current_user(user_id: int = Depends(jwt_bearer),db:Session = Depends(get
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    return user
\ No newline at end of file
+    return user
+
+
+async def is_admin(user: Users, db: Session):
+    role = await get_record_by_id(id=user.role_id, model=Roles, db=db, profile="auth")
+    return role is not None and role.role_name == "admin"
+
+
+async def get_current_admin(current_user: Users = Depends(get_current_user),db:Session = Depends(get_async_db)):
+    
+    if not await is_admin(current_user, db):
+        raise HTTPException(
+            status_code = status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    return current_user
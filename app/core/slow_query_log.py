@@ -0,0 +1,166 @@
+# app/core/slow_query_log.py
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import get_settings
+import app.core.sql_instrumentation  # noqa: F401  (registers the before_cursor_execute timer)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"IN \((?:\?, )*\?\)", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """Statement text with literals and bind parameters collapsed to '?'"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = " ".join(normalized.split())
+    return _IN_LIST.sub("IN (...)", normalized)
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class SlowQueryEntry:
+    def __init__(self, fingerprint: str, max_samples: int):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.latencies = deque(maxlen=max_samples)
+        self.statement = None
+        self.parameters = None
+        self.plan = None
+        self.plan_captured_at = 0.0
+        self.last_seen = 0.0
+
+    def to_dict(self):
+        latencies = sorted(self.latencies)
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            "statement": self.statement,
+            "parameters": self.parameters,
+            "plan": self.plan,
+            "last_seen": self.last_seen,
+        }
+
+
+class SlowQueryStore:
+    """Rolling, bounded store of slow statements keyed by fingerprint."""
+
+    def __init__(self, max_fingerprints: int, max_samples: int, explain_interval: float):
+        self.max_fingerprints = max_fingerprints
+        self.max_samples = max_samples
+        self.explain_interval = explain_interval
+        self._entries: "OrderedDict[str, SlowQueryEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, parameters, elapsed: float) -> bool:
+        """Store one slow execution; returns True when a fresh plan should be captured"""
+        key = fingerprint(statement)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = SlowQueryEntry(key, self.max_samples)
+                self._entries[key] = entry
+                if len(self._entries) > self.max_fingerprints:
+                    self._entries.popitem(last=False)
+            self._entries.move_to_end(key)
+
+            entry.count += 1
+            entry.latencies.append(elapsed)
+            entry.statement = statement
+            entry.parameters = repr(parameters)[:2000]
+            entry.last_seen = now
+            return now - entry.plan_captured_at >= self.explain_interval
+
+    def set_plan(self, statement: str, plan: str):
+        with self._lock:
+            entry = self._entries.get(fingerprint(statement))
+            if entry is not None:
+                entry.plan = plan
+                entry.plan_captured_at = time.time()
+
+    def top(self, limit: int):
+        with self._lock:
+            entries = [entry.to_dict() for entry in self._entries.values()]
+        entries.sort(key=lambda e: e["p95_ms"], reverse=True)
+        return entries[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_store = SlowQueryStore(
+    max_fingerprints=settings.SLOW_QUERY_MAX_FINGERPRINTS,
+    max_samples=settings.SLOW_QUERY_MAX_SAMPLES,
+    explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS
+)
+
+
+# --------------------- EXPLAIN CAPTURE ---------------------
+_DATA_MODIFYING = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+
+def _is_read_only(statement: str) -> bool:
+    """Plain SELECTs only: a WITH can hide a data-modifying CTE that EXPLAIN ANALYZE would execute"""
+    head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return head == "SELECT" and not _DATA_MODIFYING.search(_STRING_LITERAL.sub("?", statement))
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    """
+    EXPLAIN (ANALYZE, BUFFERS) inside a savepoint that is always rolled back,
+    so neither a failure nor any side effect of re-running the statement
+    reaches the caller's transaction
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _capture_slow_query(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "_query_started_at", None)
+    if started_at is None:
+        return
+
+    elapsed = time.perf_counter() - started_at
+    if elapsed * 1000 < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    needs_plan = slow_query_store.record(statement, parameters, elapsed)
+    logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split())[:300])
+
+    if not (settings.SLOW_QUERY_EXPLAIN and needs_plan) or executemany or not _is_read_only(statement):
+        return
+
+    try:
+        slow_query_store.set_plan(statement, _explain(conn, statement, parameters))
+    except Exception as e:
+        logger.debug("Could not capture plan for slow query: %s", e)
@@ -0,0 +1,117 @@
+# app/core/sql_instrumentation.py
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class RequestSQLStats:
+    """Statements issued while serving a single request.
+
+    Locked because a request may fan out to threadpool workers (e.g. /search)
+    that all record into the same stats through the copied context.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float):
+        with self._lock:
+            self.count += 1
+            self.duration += elapsed
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int):
+        """Identical statements issued at least `threshold` times (likely N+1)"""
+        with self._lock:
+            return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+    def server_timing(self, total_ms: float):
+        with self._lock:
+            return (
+                f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries", '
+                f"app;dur={total_ms:.2f}"
+            )
+
+
+_request_stats: ContextVar[Optional[RequestSQLStats]] = ContextVar("request_sql_stats", default=None)
+
+
+def current_sql_stats() -> Optional[RequestSQLStats]:
+    return _request_stats.get()
+
+
+# --------------------- ENGINE EVENT HOOKS ---------------------
+# Registered on the Engine class so the sync, async and replica engines
+# are all covered.
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    started_at = getattr(context, "_query_started_at", None)
+    if stats is None or started_at is None:
+        return
+    stats.record(statement, time.perf_counter() - started_at)
+
+
+# --------------------- MIDDLEWARE ---------------------
+class SQLInstrumentationMiddleware:
+    """Counts statements and DB time per request and emits Server-Timing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats()
+        token = _request_stats.set(stats)
+        started_at = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started_at) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(total_ms))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            total_ms = (time.perf_counter() - started_at) * 1000
+            self._report(scope, stats, total_ms)
+
+    def _report(self, scope, stats: RequestSQLStats, total_ms: float):
+        route = f"{scope.get('method')} {scope.get('path')}"
+
+        if stats.count > settings.SQL_QUERY_BUDGET or total_ms > settings.SQL_LATENCY_BUDGET_MS:
+            logger.warning(
+                "Request over budget: %s issued %d queries, %.1f ms in db, %.1f ms total",
+                route, stats.count, stats.duration * 1000, total_ms
+            )
+
+        for statement, n in stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                "Possible N+1 on %s: statement repeated %d times: %s",
+                route, n, " ".join(statement.split())[:300]
+            )
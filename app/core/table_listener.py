@@ -0,0 +1,129 @@
+# app/core/table_listener.py
+import logging
+import select
+import threading
+from typing import Callable, Iterable, Optional
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import text
+from app.core.database_postgres import DATABASE_URL, engine
+
+logger = logging.getLogger(__name__)
+
+# Channel per table, notified by the statement-level triggers from install_change_triggers()
+CHANNEL_PREFIX = "table_changed_"
+
+
+def install_change_triggers(tables: Iterable[str]):
+    """Create the NOTIFY trigger on every table that lacks it; safe to run from each worker"""
+    with engine.begin() as conn:
+        # Workers start together; serialise so concurrent CREATE OR REPLACE / CREATE TRIGGER don't collide
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('notify_table_change'));"))
+
+        # Statement-level so a bulk UPDATE sends one notification, not one per row
+        conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION notify_table_change()
+        RETURNS trigger AS $$
+        BEGIN
+          PERFORM pg_notify('{CHANNEL_PREFIX}' || TG_TABLE_NAME, TG_OP);
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """))
+
+        # CREATE TRIGGER locks the table against writes; hot tables that already have it are left alone
+        existing = set(conn.execute(text(
+            "SELECT tgrelid::regclass::text FROM pg_trigger WHERE tgname = 'trg_notify_' || tgrelid::regclass::text || '_change';"
+        )).scalars())
+
+        for table in sorted(set(tables) - existing):
+            conn.execute(text(f"""
+            CREATE TRIGGER trg_notify_{table}_change
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION notify_table_change();
+            """))
+
+
+class TableChangeListener:
+    """
+    LISTENs on one channel per table over a dedicated primary connection
+    (outside the pool) and calls every subscriber with the changed table
+    name. After a (re)connect subscribers get None: notifications may have
+    been missed, so anything derived from the tables may be stale.
+    """
+
+    def __init__(self, reconnect_seconds: float = 5.0):
+        self.reconnect_seconds = reconnect_seconds
+        self._tables: set = set()
+        self._subscribers: list = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def tables(self) -> frozenset:
+        return frozenset(self._tables)
+
+    def subscribe(self, tables: Iterable[str], callback: Callable[[Optional[str]], None]):
+        """Call `callback(table)` whenever one of `tables` changes; register before start()"""
+        self._tables.update(tables)
+        self._subscribers.append(callback)
+
+    def start(self):
+        """Install triggers on every subscribed table, then start listening"""
+        if self._thread is not None or not self._subscribers:
+            return
+        try:
+            install_change_triggers(self._tables)
+        except Exception as e:
+            # Still listen: triggers installed earlier (or by alter_scripts) keep working
+            logger.warning("Could not install table change triggers, relying on periodic refreshes: %s", e)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="table_change_listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.reconnect_seconds)
+            self._thread = None
+
+    # --------------------- LOOP ---------------------
+    def _run(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(DATABASE_URL)
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    for table in sorted(self._tables):
+                        cursor.execute(f"LISTEN {CHANNEL_PREFIX}{table};")
+                logger.info("Listening for changes on %d tables", len(self._tables))
+                self._dispatch(None)
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    # One callback per table however many statements touched it
+                    changed = {notify.channel[len(CHANNEL_PREFIX):] for notify in conn.notifies}
+                    conn.notifies.clear()
+                    for table in changed:
+                        self._dispatch(table)
+
+            except Exception as e:
+                logger.warning("Table change listener disconnected, retrying in %ss: %s", self.reconnect_seconds, e)
+                self._stop.wait(self.reconnect_seconds)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _dispatch(self, table: Optional[str]):
+        for callback in self._subscribers:
+            try:
+                callback(table)
+            except Exception as e:
+                logger.warning("Table change subscriber failed for %s: %s", table, e)
+
+
+table_listener = TableChangeListener()
@@ -1,8 +1,517 @@
+import logging
+from collections import defaultdict
 from datetime import date
-from typing import List
+from typing import Dict, List, Optional
+from fastapi import HTTPException
 from requests import Session
+from sqlalchemy import Date, Integer, String, cast, column, func, insert, literal, select, union_all, update, values
+from app.core.config import get_settings
+from app.core.database_postgres import SessionLocal
+from app.crud.generic_crud import execute_query, returning_columns
+from app.crud.rooms import overlapping_bookings
+from app.models.Enum import BookingStatusEnum, GroupBookingPolicyEnum, PaymentStatusEnum, RoomStatusEnum
+from app.models.addon import Addons
+from app.models.associations import room_type_features
+from app.models.bed_type import BedTypes
+from app.models.booking_addon import BookingAddons
+from app.models.booking_status_history import BookingStatusHistory
+from app.models.bookings import Bookings
+from app.models.features import Features
+from app.models.floor import Floors
+from app.models.payment import Payments
+from app.models.rating_reviews import RatingsReviews
+from app.models.roomType_bedType import RoomTypeBedTypes
+from app.models.room_type import RoomTypeWithSizes
+from app.models.rooms import Rooms
+from app.schemas.booking_schema import GroupBookingRequest
+from app.services import booking_events
+from app.services.rate_engine import rate_engine
+from app.services.room_type_index import room_type_index
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+#---------------------------- Addons ------------------------------
+
+def parse_addon_list(addon_list: Optional[List[str]]) -> Dict[int, int]:
+    """'addon_id:quantity' strings -> {addon_id: quantity}, repeated ids are summed"""
+    quantities: Dict[int, int] = {}
+    if not addon_list or addon_list == ["string"]:
+        return quantities
+    for addon in addon_list:
+        try:
+            addon_id, quantity = (int(part) for part in addon.split(':'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid addon format: {addon}")
+        if quantity <= 0:
+            raise HTTPException(status_code=400, detail=f"Addon quantity must be positive: {addon}")
+        quantities[addon_id] = quantities.get(addon_id, 0) + quantity
+    return quantities
+
+
+async def addon_prices(db: Session, addon_ids: List[int]) -> Dict[int, int]:
+    """Base price of every requested addon in one IN query; 404 if any id is unknown"""
+    if not addon_ids:
+        return {}
+    result = await execute_query(db, select(Addons.id, Addons.base_price).where(Addons.id.in_(addon_ids)))
+    prices = dict(result.all())
+    missing = sorted(set(addon_ids) - prices.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Addon with ID {', '.join(map(str, missing))} not found")
+    return prices
+
+
+def addon_amount(addon_quantities: Dict[int, int], prices: Dict[int, int]) -> int:
+    """Charge for the addons of one booking: base price times quantity"""
+    return sum(prices[addon_id] * quantity for addon_id, quantity in addon_quantities.items())
+
 
 #---------------------------- Filter ------------------------------
 
-async def whole_filter(db : Session, room_price : int,floor_no : int ,room_type_name : List[str],ratings : int,features : List[str],bet_type_names : List[str] ,check_in : date,check_out : date):
-    pass
\ No newline at end of file
+def rooms_with_min_rating(min_rating: int):
+    """Room ids whose average rating is at least `min_rating`, aggregated in SQL"""
+    return (
+        select(RatingsReviews.room_id)
+        .where(RatingsReviews.ratings.isnot(None))
+        .group_by(RatingsReviews.room_id)
+        .having(func.avg(RatingsReviews.ratings) >= min_rating)
+    )
+
+
+def room_types_with_all(link_table, link_column, name_table, name_column, names: List[str]):
+    """Room type ids linked to every one of `names`"""
+    return (
+        select(link_table.c.room_type_id)
+        .select_from(link_table.join(name_table, name_table.c.id == link_column))
+        .where(name_column.in_(names))
+        .group_by(link_table.c.room_type_id)
+        .having(func.count(func.distinct(link_column)) == len(set(names)))
+    )
+
+
+def filter_conditions(
+    room_price: Optional[int],
+    floor_no: Optional[int],
+    room_type_name: Optional[str],
+    features: Optional[List[str]],
+    bet_type_names: Optional[List[str]],
+    check_in: Optional[date],
+    check_out: Optional[date],
+    min_rating: Optional[int]
+):
+    conditions = []
+    if room_price is not None:
+        conditions.append(RoomTypeWithSizes.base_price <= room_price)
+    if floor_no is not None:
+        conditions.append(Floors.floor_no == floor_no)
+    if room_type_name:
+        conditions.append(RoomTypeWithSizes.room_name == room_type_name)
+    indexed_room_types = room_type_index.room_types_with(features, bet_type_names) if features or bet_type_names else None
+    if indexed_room_types is not None:
+        conditions.append(Rooms.room_type_id.in_(indexed_room_types))
+    elif features:
+        feature_room_types = room_types_with_all(
+            room_type_features, room_type_features.c.feature_id,
+            Features.__table__, Features.feature_name, features
+        )
+        conditions.append(Rooms.room_type_id.in_(feature_room_types))
+    if bet_type_names and indexed_room_types is None:
+        bed_room_types = room_types_with_all(
+            RoomTypeBedTypes.__table__, RoomTypeBedTypes.bed_type_id,
+            BedTypes.__table__, BedTypes.bed_type_name, bet_type_names
+        )
+        conditions.append(Rooms.room_type_id.in_(bed_room_types))
+    if check_in and check_out:
+        booked = (
+            select(Bookings.id)
+            .where(Bookings.room_id == Rooms.id, overlapping_bookings(check_in, check_out))
+            .exists()
+        )
+        conditions.append(~booked)
+    if min_rating is not None:
+        conditions.append(Rooms.id.in_(rooms_with_min_rating(min_rating)))
+    return conditions
+
+
+def facet_query(matched, price_bucket: int):
+    """One UNION ALL statement returning (facet, value, count) rows over the matched rooms"""
+    bucket = (matched.c.base_price // price_bucket) * price_bucket
+
+    by_feature = (
+        select(literal("features", String).label("facet"), Features.feature_name.label("value"), func.count(matched.c.room_id).label("count"))
+        .select_from(matched)
+        .join(room_type_features, room_type_features.c.room_type_id == matched.c.room_type_id)
+        .join(Features, Features.id == room_type_features.c.feature_id)
+        .group_by(Features.feature_name)
+    )
+    by_bed_type = (
+        select(literal("bed_types", String), BedTypes.bed_type_name, func.count(matched.c.room_id))
+        .select_from(matched)
+        .join(RoomTypeBedTypes, RoomTypeBedTypes.room_type_id == matched.c.room_type_id)
+        .join(BedTypes, BedTypes.id == RoomTypeBedTypes.bed_type_id)
+        .group_by(BedTypes.bed_type_name)
+    )
+    by_price = (
+        select(literal("price_buckets", String), cast(bucket, String), func.count(matched.c.room_id))
+        .select_from(matched)
+        .group_by(bucket)
+    )
+    by_floor = (
+        select(literal("floors", String), cast(matched.c.floor_no, String), func.count(matched.c.room_id))
+        .select_from(matched)
+        .group_by(matched.c.floor_no)
+    )
+    return union_all(by_feature, by_bed_type, by_price, by_floor)
+
+
+async def whole_filter(
+    db: Session,
+    room_price: Optional[int] = None,
+    floor_no: Optional[int] = None,
+    room_type_name: Optional[str] = None,
+    ratings: Optional[int] = None,
+    features: Optional[List[str]] = None,
+    bet_type_names: Optional[List[str]] = None,
+    check_in: Optional[date] = None,
+    check_out: Optional[date] = None,
+    after_id: Optional[int] = None,
+    limit: int = 20,
+    price_bucket: int = 1000
+):
+    if (check_in is None) != (check_out is None):
+        raise HTTPException(status_code=400, detail="check_in and check_out must be given together")
+    if check_in and check_in >= check_out:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+
+    conditions = filter_conditions(
+        room_price, floor_no, room_type_name, features, bet_type_names, check_in, check_out, ratings
+    )
+    # Only bookable rooms, as in available_rooms_query
+    conditions.append(Rooms.status == RoomStatusEnum.AVAILABLE)
+
+    matched = (
+        select(
+            Rooms.id.label("room_id"),
+            Rooms.room_no,
+            Floors.floor_no,
+            RoomTypeWithSizes.id.label("room_type_id"),
+            RoomTypeWithSizes.room_name,
+            RoomTypeWithSizes.base_price,
+            RoomTypeWithSizes.no_of_adult,
+            RoomTypeWithSizes.no_of_child
+        )
+        .join(RoomTypeWithSizes, Rooms.room_type_id == RoomTypeWithSizes.id)
+        .join(Floors, Rooms.floor_id == Floors.id)
+        .where(*conditions)
+    ).cte("matched")
+
+    page_query = select(matched).order_by(matched.c.room_id).limit(limit + 1)
+    if after_id is not None:
+        page_query = page_query.where(matched.c.room_id > after_id)
+
+    rows = [dict(row) for row in (await execute_query(db, page_query)).mappings().all()]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    facets = {"features": {}, "bed_types": {}, "price_buckets": [], "floors": {}}
+    total = 0
+    for facet, value, count in (await execute_query(db, facet_query(matched, price_bucket))).all():
+        if facet == "price_buckets":
+            low = int(value)
+            facets[facet].append({"min": low, "max": low + price_bucket - 1, "count": count})
+        elif facet == "floors":
+            facets[facet][int(value)] = count
+            total += count
+        else:
+            facets[facet][value] = count
+    facets["price_buckets"].sort(key=lambda b: b["min"])
+
+    return {
+        "results": rows,
+        "count": len(rows),
+        "total": total,
+        "next_after_id": rows[-1]["room_id"] if has_more else None,
+        "facets": facets
+    }
+
+
+#---------------------------- Group booking ------------------------------
+
+async def lock_rooms(db: Session, room_ids: List[int]) -> Dict[int, tuple]:
+    """Lock the requested rooms in id order (deadlock-free across groups); room id -> (room type id, base price)"""
+    statement = (
+        select(Rooms.id, Rooms.room_type_id, RoomTypeWithSizes.base_price)
+        .join(RoomTypeWithSizes, Rooms.room_type_id == RoomTypeWithSizes.id)
+        .where(Rooms.id.in_(room_ids))
+        .order_by(Rooms.id)
+        .with_for_update(of=Rooms)
+    )
+    return {room_id: (room_type_id, base_price) for room_id, room_type_id, base_price in (await execute_query(db, statement)).all()}
+
+
+async def conflicting_requests(db: Session, items) -> set:
+    """Indexes of requested stays that overlap an occupying booking, in one set-based query"""
+    requested = values(
+        column("idx", Integer),
+        column("room_id", Integer),
+        column("check_in", Date),
+        column("check_out", Date),
+        name="requested"
+    ).data([(idx, item.room_id, item.check_in, item.check_out) for idx, item in enumerate(items)])
+
+    booked = (
+        select(Bookings.id)
+        .where(
+            Bookings.room_id == requested.c.room_id,
+            overlapping_bookings(requested.c.check_in, requested.c.check_out)
+        )
+        .exists()
+    )
+    result = await execute_query(db, select(requested.c.idx).where(booked))
+    return set(result.scalars().all())
+
+
+def overlapping_within(items) -> set:
+    """Indexes of stays that overlap an earlier stay of the same room in the same request"""
+    clashes = set()
+    stays_by_room = defaultdict(list)
+    for idx, item in enumerate(items):
+        for check_in, check_out in stays_by_room[item.room_id]:
+            if item.check_in < check_out and check_in < item.check_out:
+                clashes.add(idx)
+                break
+        else:
+            stays_by_room[item.room_id].append((item.check_in, item.check_out))
+    return clashes
+
+
+async def create_group_booking(db: Session, request: GroupBookingRequest, user_id: int):
+    """Validate and write a group booking; the caller owns the transaction (unit_of_work)"""
+    items = request.rooms
+    quantities = [parse_addon_list(item.addon_list) for item in items]
+    prices = await addon_prices(db, sorted({addon_id for q in quantities for addon_id in q}))
+
+    room_prices = await lock_rooms(db, sorted({item.room_id for item in items}))
+    conflicts = await conflicting_requests(db, items)
+    clashes = overlapping_within(items)
+
+    rejected = []
+    for idx, item in enumerate(items):
+        if item.room_id not in room_prices:
+            rejected.append({"index": idx, "room_id": item.room_id, "reason": "Room not found"})
+        elif idx in conflicts:
+            rejected.append({"index": idx, "room_id": item.room_id, "reason": "Room is not available for these dates"})
+        elif idx in clashes:
+            rejected.append({"index": idx, "room_id": item.room_id, "reason": "Overlaps another stay of this room in the request"})
+
+    if rejected and request.policy == GroupBookingPolicyEnum.ALL_OR_NOTHING:
+        raise HTTPException(status_code=409, detail={"message": "Some rooms cannot be booked", "rejected": rejected})
+
+    rejected_idx = {r["index"] for r in rejected}
+    accepted = [idx for idx in range(len(items)) if idx not in rejected_idx]
+    if not accepted:
+        return {"booked": [], "rejected": rejected}
+
+    quotes = rate_engine.quote(
+        [room_prices[items[idx].room_id][0] for idx in accepted],
+        [items[idx].check_in for idx in accepted],
+        [items[idx].check_out for idx in accepted]
+    )
+    room_amounts = {
+        idx: quote["total"] if quote is not None
+        else (items[idx].check_out - items[idx].check_in).days * room_prices[items[idx].room_id][1]
+        for idx, quote in zip(accepted, quotes)
+    }
+    booking_rows = (await execute_query(
+        db,
+        insert(Bookings)
+        .values([
+            {
+                "user_id": user_id,
+                "room_id": items[idx].room_id,
+                "check_in": items[idx].check_in,
+                "check_out": items[idx].check_out,
+                "booking_status": BookingStatusEnum.CONFIRMED,
+                "total_amount": room_amounts[idx]
+            }
+            for idx in accepted
+        ])
+        .returning(*returning_columns(Bookings))
+    )).mappings().all()
+
+    # Accepted stays never overlap, so (room, check_in) identifies each returned row
+    booking_by_stay = {(row["room_id"], row["check_in"]): dict(row) for row in booking_rows}
+    bookings = {idx: booking_by_stay[(items[idx].room_id, items[idx].check_in)] for idx in accepted}
+
+    addon_rows = [
+        {"booking_id": bookings[idx]["id"], "addon_id": addon_id, "quantity": quantity}
+        for idx in accepted
+        for addon_id, quantity in quantities[idx].items()
+    ]
+    if addon_rows:
+        await execute_query(db, insert(BookingAddons), addon_rows)
+
+    payment_rows = (await execute_query(
+        db,
+        insert(Payments)
+        .values([
+            {
+                "booking_id": bookings[idx]["id"],
+                "total_amount": room_amounts[idx] + addon_amount(quantities[idx], prices),
+                "status": PaymentStatusEnum.PAID
+            }
+            for idx in accepted
+        ])
+        .returning(Payments.id, Payments.booking_id, Payments.total_amount, Payments.status)
+    )).mappings().all()
+    payment_by_booking = {row["booking_id"]: dict(row) for row in payment_rows}
+
+    booked = []
+    for idx in accepted:
+        booking = bookings[idx]
+        booking["index"] = idx
+        booking["addons"] = [
+            {"addon_id": addon_id, "quantity": quantity, "base_price": prices[addon_id]}
+            for addon_id, quantity in quantities[idx].items()
+        ]
+        booking["payment"] = payment_by_booking[booking["id"]]
+        booked.append(booking)
+
+    return {"booked": booked, "rejected": rejected}
+
+
+#---------------------------- Booking writes ------------------------------
+
+async def stay_amount(db: Session, room_id: int, check_in: date, check_out: date) -> Optional[int]:
+    """Room charge for a stay from the rate engine (base price per night if it cannot answer); None if no room"""
+    row = (await execute_query(
+        db,
+        select(Rooms.room_type_id, RoomTypeWithSizes.base_price)
+        .join(RoomTypeWithSizes, Rooms.room_type_id == RoomTypeWithSizes.id)
+        .where(Rooms.id == room_id)
+    )).first()
+    if row is None:
+        return None
+    total = rate_engine.stay_total(row.room_type_id, check_in, check_out)
+    return total if total is not None else (check_out - check_in).days * row.base_price
+
+
+async def insert_addons_and_payment(db: Session, booking_id: int, room_amount: int, addon_quantities: Dict[int, int], prices: Dict[int, int]):
+    """Bulk-insert BookingAddons and the PAID payment; returns the payment row"""
+    if addon_quantities:
+        await execute_query(db, insert(BookingAddons), [
+            {"booking_id": booking_id, "addon_id": addon_id, "quantity": quantity}
+            for addon_id, quantity in addon_quantities.items()
+        ])
+
+    payment_row = (await execute_query(
+        db,
+        insert(Payments)
+        .values(
+            booking_id=booking_id,
+            total_amount=room_amount + addon_amount(addon_quantities, prices),
+            status=PaymentStatusEnum.PAID
+        )
+        .returning(Payments.id, Payments.total_amount, Payments.status)
+    )).mappings().one()
+    return dict(payment_row)
+
+
+#---------------------------- Holds ------------------------------
+
+async def confirm_hold(db: Session, booking_id: int, user_id: int) -> Optional[dict]:
+    """PENDING -> CONFIRMED if the user's hold is still live; None when missing, not theirs, expired or already settled"""
+    result = await execute_query(
+        db,
+        update(Bookings)
+        .where(
+            Bookings.id == booking_id,
+            Bookings.user_id == user_id,
+            Bookings.booking_status == BookingStatusEnum.PENDING,
+            Bookings.hold_expires_at > func.now()
+        )
+        .values(booking_status=BookingStatusEnum.CONFIRMED, hold_expires_at=None)
+        .returning(*returning_columns(Bookings))
+    )
+    row = result.mappings().first()
+    if row is None:
+        return None
+    await insert_status_history(db, [row["id"]], BookingStatusEnum.PENDING, BookingStatusEnum.CONFIRMED)
+    return dict(row)
+
+
+async def release_hold(db: Session, booking_id: int, user_id: int) -> Optional[dict]:
+    """PENDING -> CANCELLED; None when the user has no pending hold with that id"""
+    result = await execute_query(
+        db,
+        update(Bookings)
+        .where(
+            Bookings.id == booking_id,
+            Bookings.user_id == user_id,
+            Bookings.booking_status == BookingStatusEnum.PENDING
+        )
+        .values(booking_status=BookingStatusEnum.CANCELLED, hold_expires_at=None)
+        .returning(Bookings.id, Bookings.room_id, Bookings.check_in, Bookings.check_out)
+    )
+    row = result.mappings().first()
+    if row is None:
+        return None
+    await insert_status_history(db, [row["id"]], BookingStatusEnum.PENDING, BookingStatusEnum.CANCELLED)
+    return dict(row)
+
+
+async def insert_status_history(db: Session, booking_ids: List[int], old_status: BookingStatusEnum, new_status: BookingStatusEnum):
+    if booking_ids:
+        await execute_query(db, insert(BookingStatusHistory), [
+            {"booking_id": booking_id, "old_status": old_status.value, "new_status": new_status.value}
+            for booking_id in booking_ids
+        ])
+
+
+def expire_stale_holds():
+    """Reaper: cancel expired holds in SKIP LOCKED batches, one short transaction each"""
+    batch_size = settings.BOOKING_HOLD_REAPER_BATCH_SIZE
+    expired_total = 0
+    db = SessionLocal()
+    try:
+        while True:
+            expired = (
+                select(Bookings.id)
+                .where(
+                    Bookings.booking_status == BookingStatusEnum.PENDING,
+                    Bookings.hold_expires_at < func.now()
+                )
+                .order_by(Bookings.hold_expires_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .cte("expired")
+            )
+            rows = db.execute(
+                update(Bookings)
+                .where(Bookings.id == expired.c.id)
+                .values(booking_status=BookingStatusEnum.CANCELLED, hold_expires_at=None)
+                .returning(Bookings.id, Bookings.room_id, Bookings.check_in, Bookings.check_out)
+            ).all()
+            if rows:
+                db.execute(insert(BookingStatusHistory), [
+                    {
+                        "booking_id": row.id,
+                        "old_status": BookingStatusEnum.PENDING.value,
+                        "new_status": BookingStatusEnum.CANCELLED.value
+                    }
+                    for row in rows
+                ])
+            db.commit()
+
+            for row in rows:
+                booking_events.booking_released(row.room_id, row.check_in, row.check_out)
+            expired_total += len(rows)
+            if len(rows) < batch_size:
+                break
+    finally:
+        db.close()
+
+    if expired_total:
+        logger.info("Expired %d booking holds", expired_total)
+    return expired_total
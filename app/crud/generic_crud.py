@@ -1,37 +1,128 @@
 import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
 from bson import ObjectId
 from fastapi import HTTPException, UploadFile
-from sqlalchemy import func, text
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Float, Integer, and_, delete, func, inspect, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Type
+from typing import Optional, Type
+from app.core.config import get_settings
+from app.crud.load_profiles import load_options
+from app.services.search_cache import search_cache
 from app.utils import convertTOString,formatDatetime
+import logging
 import operator
 
-# --------------------- COMMIT HELPER ---------------------
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# --------------------- SESSION HELPERS ---------------------
+# Every helper below accepts either a sync Session or an AsyncSession,
+# so routers can switch to get_async_db without changing their calls.
+
+async def execute_query(db: Session, statement, params=None):
+    if isinstance(db, AsyncSession):
+        return await db.execute(statement, params)
+    return db.execute(statement, params)
+
+
 async def commit_db(db: Session):
-    db.commit()
+    if in_unit_of_work(db):
+        await flush_db(db)
+        return
+    if isinstance(db, AsyncSession):
+        await db.commit()
+    else:
+        db.commit()
+
+
+async def flush_db(db: Session):
+    if isinstance(db, AsyncSession):
+        await db.flush()
+    else:
+        db.flush()
+
+
+async def refresh_db(db: Session, instance):
+    if isinstance(db, AsyncSession):
+        await db.refresh(instance)
+    else:
+        db.refresh(instance)
+
+
+async def rollback_db(db: Session):
+    if isinstance(db, AsyncSession):
+        await db.rollback()
+    else:
+        db.rollback()
+
+
+# --------------------- UNIT OF WORK ---------------------
+# Inside `async with unit_of_work(db):` the helpers only flush, refreshes are
+# deferred to the end and a single commit happens on exit (rollback on error).
+
+UNIT_OF_WORK_KEY = "unit_of_work"
+PENDING_REFRESH_KEY = "unit_of_work_pending_refresh"
+
+
+def in_unit_of_work(db: Session) -> bool:
+    return db.info.get(UNIT_OF_WORK_KEY, False)
+
+
+@asynccontextmanager
+async def unit_of_work(db: Session):
+    if in_unit_of_work(db):
+        # Nested: the outermost unit commits
+        yield db
+        return
+
+    db.info[UNIT_OF_WORK_KEY] = True
+    pending_refresh = db.info[PENDING_REFRESH_KEY] = []
+    try:
+        yield db
+        db.info[UNIT_OF_WORK_KEY] = False
+        await commit_db(db)
+        # Load server defaults once, after the single commit, so returned instances serialize fully
+        for instance in pending_refresh:
+            await refresh_db(db, instance)
+    except Exception:
+        await rollback_db(db)
+        raise
+    finally:
+        db.info.pop(UNIT_OF_WORK_KEY, None)
+        db.info.pop(PENDING_REFRESH_KEY, None)
+
+
+async def save_instance(db: Session, instance):
+    """Commit and refresh, or just flush when inside a unit of work"""
+    if in_unit_of_work(db):
+        await flush_db(db)
+        db.info[PENDING_REFRESH_KEY].append(instance)
+    else:
+        await commit_db(db)
+        await refresh_db(db, instance)
+    return instance
 
 
 # --------------------- CREATE ---------------------
 async def insert_record(model: Type, db: Session, **kwargs):
     instance = model(**kwargs)
     db.add(instance)
-    await commit_db(db)
-    db.refresh(instance)
-    return instance
+    return await save_instance(db, instance)
 
 async def insert_record_flush(model: Type, db: Session, **kwargs):
     instance = model(**kwargs)
     db.add(instance)
     
-    db.flush()
+    await flush_db(db)
     return instance
 
 
 # --------------------- UPDATE ---------------------
 async def update_record(id: int, model: Type, db: Session, **kwargs):
-    instance = db.query(model).filter(model.id == id).first()
+    instance = await get_record_by_id(id=id, model=model, db=db)
 
             
     if not instance:
@@ -44,43 +135,87 @@ async def update_record(id: int, model: Type, db: Session, **kwargs):
         if hasattr(instance, key):
             setattr(instance, key, value)
 
+    return await save_instance(db, instance)
+
+
+async def update_record_returning(id: int, model: Type, db: Session, **kwargs):
+    """Single UPDATE ... WHERE id = :id RETURNING <columns>, without loading the instance"""
+    kwargs.pop("created_at", None)
+    values = {key: value for key, value in kwargs.items() if key in model.__table__.c}
+    columns = returning_columns(model)
+
+    if values:
+        statement = update(model.__table__).where(model.__table__.c.id == id).values(**values).returning(*columns)
+    else:
+        statement = select(*columns).where(model.__table__.c.id == id)
+
+    row = (await execute_query(db, statement)).mappings().first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"{model.__name__} with id {id} not found")
+
     await commit_db(db)
-    db.refresh(instance)
-    return instance
+    return dict(row)
+
+
+def returning_columns(model: Type):
+    """Mapped table columns, minus deferred ones (generated columns such as Bookings.stay_range)"""
+    return [prop.columns[0] for prop in inspect(model).column_attrs if not prop.deferred]
 
 
 # --------------------- DELETE ---------------------
 async def delete_record(id: int, model: Type, db: Session):
-    instance = db.query(model).filter(model.id == id).first()
+    instance = await get_record_by_id(id=id, model=model, db=db)
 
     if not instance:
         raise HTTPException(status_code=404, detail=f"{model.__name__} with id {id} not found")
 
-    db.delete(instance)
+    if isinstance(db, AsyncSession):
+        await db.delete(instance)
+    else:
+        db.delete(instance)
     await commit_db(db)
     return instance
 
 
+async def delete_record_returning(model: Type, db: Session, **kwargs):
+    """Single DELETE ... RETURNING id; ON DELETE CASCADE removes children in the database"""
+    table = model.__table__
+    statement = (
+        delete(table)
+        .where(*(table.c[key] == value for key, value in kwargs.items()))
+        .returning(table.c.id)
+    )
+    deleted_ids = (await execute_query(db, statement)).scalars().all()
+    if not deleted_ids:
+        raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+
+    await commit_db(db)
+    return deleted_ids
+
+
 # --------------------- GET BY ID ---------------------
-async def get_record_by_id(id: int, model: Type, db: Session):
-    instance = db.query(model).filter(model.id == id).first()
-    return instance
+async def get_record_by_id(id: int, model: Type, db: Session, profile: Optional[str] = None):
+    statement = select(model).where(model.id == id).options(*load_options(model, profile))
+    result = await execute_query(db, statement)
+    return result.unique().scalars().first()
 
 
 # --------------------- GET BY FILTER ---------------------
-async def get_record(model: Type, db: Session, **kwargs):
-    instance = db.query(model).filter_by(**kwargs).first()
-    return instance
+async def get_record(model: Type, db: Session, profile: Optional[str] = None, **kwargs):
+    statement = select(model).filter_by(**kwargs).options(*load_options(model, profile))
+    result = await execute_query(db, statement)
+    return result.unique().scalars().first()
 
 
-async def get_records(model: Type, db: Session, **kwargs):
-    instance = db.query(model).filter_by(**kwargs).all()
-    return instance
+async def get_records(model: Type, db: Session, profile: Optional[str] = None, **kwargs):
+    statement = select(model).filter_by(**kwargs).options(*load_options(model, profile))
+    result = await execute_query(db, statement)
+    return result.unique().scalars().all()
 
 
 
 #---------------------------- Filter ------------------------------
-async def filter_record(db: Session, model, **kwargs):
+async def filter_record(db: Session, model, profile: Optional[str] = None, **kwargs):
     OPERATORS = {
         "==": operator.eq,
         "!=": operator.ne,
@@ -96,21 +231,92 @@ async def filter_record(db: Session, model, **kwargs):
         op_fun = OPERATORS.get(op)
 
         column = getattr(model, key, None)
-        if not column:
+        if column is None:
             raise ValueError(f"Invalid filter column: {key}")
 
         where_list.append(op_fun(column, fil_value))
 
-    instances = db.query(model).filter(operator.and_(*where_list)).all()
-    return instances
+    statement = select(model).where(and_(*where_list)).options(*load_options(model, profile))
+    result = await execute_query(db, statement)
+    return result.unique().scalars().all()
 
 
 #------------------------------ SEARCH ------------------------------
 
-def search(db: Session, model, q: str, page: int, per_page: int):
+def trigram_threshold_for(table: str) -> float:
+    return settings.SEARCH_TRIGRAM_THRESHOLDS.get(table, settings.SEARCH_TRIGRAM_DEFAULT_THRESHOLD)
+
+
+def hybrid_ranking(model, q: str):
+    """
+    CTE of (id, score) for every row matching q by full-text, trigram or substring.
+
+    Each branch of the UNION ALL is served by the table's GIN index; rows found
+    by several branches are merged so one score per row blends the normalised
+    ts_rank_cd (flag 32: rank / (rank + 1)) with trigram word similarity.
+    `<%` prunes through the index at the connection-wide threshold and the
+    explicit word_similarity check applies this table's own.
+    """
+    table = model.__tablename__
+    matches = text(f"""
+        SELECT id,
+               ts_rank_cd(search_vector, websearch_to_tsquery('english', :q), 32) AS fts_rank,
+               0.0 AS trigram_rank
+        FROM {table}
+        WHERE search_vector @@ websearch_to_tsquery('english', :q)
+        UNION ALL
+        SELECT id, 0.0, word_similarity(:q, search_text)
+        FROM {table}
+        WHERE (:q <% search_text AND word_similarity(:q, search_text) >= :threshold)
+           OR search_text ILIKE :pattern
+    """).bindparams(q=q, pattern=f"%{q}%", threshold=trigram_threshold_for(table)).columns(id=Integer, fts_rank=Float, trigram_rank=Float).cte(f"{table}_matches")
+
+    score = (
+        func.max(matches.c.fts_rank) * settings.SEARCH_FTS_WEIGHT
+        + func.max(matches.c.trigram_rank) * settings.SEARCH_TRIGRAM_WEIGHT
+    ).label("score")
+    return select(matches.c.id, score).group_by(matches.c.id).cte(f"{table}_ranked")
+
+
+def ranked_search(db: Session, model, q: str, limit: int, offset: int = 0, profile: Optional[str] = None, filters=()):
+    """(instance, score) pairs in hybrid ranking order, score normalised to [0, 1]"""
+    ranked = hybrid_ranking(model, q)
+    score = ranked.c.score / (settings.SEARCH_FTS_WEIGHT + settings.SEARCH_TRIGRAM_WEIGHT)
+    return (
+        db.query(model, score)
+          .join(ranked, model.id == ranked.c.id)
+          .options(*load_options(model, profile))
+          .filter(*filters)
+          .order_by(ranked.c.score.desc(), model.id)
+          .offset(offset)
+          .limit(limit)
+          .all()
+    )
+
+
+def search(db: Session, model, q: str, page: int, per_page: int, mode: Optional[str] = None):
+    """Serialized search results, served from search_cache when the same query was seen recently"""
+    mode = mode or settings.SEARCH_DEFAULT_MODE
+    if not settings.SEARCH_CACHE_ENABLED:
+        return jsonable_encoder(run_search(db, model, q, page, per_page, mode))
+
+    key = search_cache.key(model.__tablename__, q, page, per_page, mode)
+    results = search_cache.get(key)
+    if results is None:
+        results = jsonable_encoder(run_search(db, model, q, page, per_page, mode))
+        search_cache.put(key, results)
+    return results
+
+
+def run_search(db: Session, model, q: str, page: int, per_page: int, mode: str):
     offset = (page - 1) * per_page
-    
-    # ---------------- FULL TEXT SEARCH ----------------
+
+    if mode == "hybrid":
+        instances = [row[0] for row in ranked_search(db, model, q, limit=per_page, offset=offset)]
+        logger.debug("search %s: hybrid ranking returned %d rows", model.__tablename__, len(instances))
+        return instances
+
+    # ---------------- FULL TEXT SEARCH (CASCADE) ----------------
     ts_query = func.websearch_to_tsquery('english', q)
     rank = func.ts_rank_cd(text('search_vector'), ts_query).label('rank')
 
@@ -127,21 +333,20 @@ def search(db: Session, model, q: str, page: int, per_page: int):
 
     if results:
         instances = [row[0] for row in results]
-        print("FTS_result")
+        logger.debug("search %s: full-text tier matched", model.__tablename__)
         return instances
 
     # ---------------- TRIGRAM SEARCH (PREFIX/SUFFIX/FUZZY) ----------------
-    # If FTS returns no results, fall back to trigram similarity search
+    # If FTS returns no results, fall back to trigram word similarity search
     # This handles partial matches, typos, prefix, and suffix searches
-    
-    db.execute(text("SELECT set_limit(0.005);"))
+    # (pg_trgm thresholds are set once per connection, see database_postgres)
         
-    similarity = func.similarity(text('search_text'), q).label('similarity')
+    similarity = func.word_similarity(q, text('search_text')).label('similarity')
     
     trigram_q = (
         db.query(model, similarity)
-        .filter(text("search_text % :q")) 
-        .params(q=q)
+        .filter(text(":q <% search_text AND word_similarity(:q, search_text) >= :threshold")) 
+        .params(q=q, threshold=trigram_threshold_for(model.__tablename__))
         .order_by(text("similarity DESC"))
         .offset(offset)
         .limit(per_page)
@@ -151,7 +356,7 @@ def search(db: Session, model, q: str, page: int, per_page: int):
     
     if trigram_results:
         instances = [row[0] for row in trigram_results]
-        print("trigram_results")
+        logger.debug("search %s: trigram tier matched", model.__tablename__)
         return instances
     
     
@@ -168,7 +373,7 @@ def search(db: Session, model, q: str, page: int, per_page: int):
     )
     
     ilike_results = ilike_q.all()
-    print("like_result")
+    logger.debug("search %s: ILIKE tier returned %d rows", model.__tablename__, len(ilike_results))
     return ilike_results if ilike_results else []  
 
    
@@ -220,7 +425,8 @@ async def update_record_mongo(id: str, collection, update_data: dict):
     except Exception:
         return {"updated": False, "error": "Invalid ID format"}
 
-    update_data["created_at"] = formatDatetime(update_data["created_at"])
+    if "created_at" in update_data:
+        update_data["created_at"] = formatDatetime(update_data["created_at"])
 
 
     result = await collection.update_one(
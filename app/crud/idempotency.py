@@ -0,0 +1,90 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.database_postgres import SessionLocal
+from app.crud.generic_crud import execute_query
+from app.models.idempotency import IdempotencyKeys
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Idempotency-Key flow, all inside the caller's unit_of_work:
+#   claim_idempotency_key -> do the work -> save_idempotent_response -> commit
+# A concurrent retry blocks on the uncommitted key row until the first request
+# commits (and is replayed) or rolls back (and the retry runs for real).
+
+
+def request_fingerprint(endpoint: str, payload) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{endpoint}:{body}".encode()).hexdigest()
+
+
+async def claim_idempotency_key(db: Session, key: Optional[str], user_id: int, endpoint: str, fingerprint: str):
+    """Reserve `key` for this request; returns the stored response if it was already served"""
+    if not key:
+        return None
+
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    values = {
+        "user_id": user_id,
+        "key": key,
+        "endpoint": endpoint,
+        "request_hash": fingerprint,
+        "response": None,
+        "expires_at": expires_at
+    }
+    statement = insert(IdempotencyKeys).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[IdempotencyKeys.user_id, IdempotencyKeys.key],
+        set_={name: statement.excluded[name] for name in ("endpoint", "request_hash", "response", "expires_at")},
+        # Only an expired key may be taken over
+        where=IdempotencyKeys.expires_at < func.now()
+    ).returning(IdempotencyKeys.key)
+
+    if (await execute_query(db, statement)).first() is not None:
+        return None
+
+    stored = (await execute_query(
+        db,
+        select(IdempotencyKeys.endpoint, IdempotencyKeys.request_hash, IdempotencyKeys.response)
+        .where(IdempotencyKeys.user_id == user_id, IdempotencyKeys.key == key)
+    )).first()
+
+    if stored.endpoint != endpoint or stored.request_hash != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    if stored.response is None:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    return stored.response
+
+
+async def save_idempotent_response(db: Session, key: Optional[str], user_id: int, response):
+    """Store the response next to the claimed key; committed with the rest of the unit of work"""
+    if not key:
+        return response
+    encoded = jsonable_encoder(response)
+    await execute_query(
+        db,
+        update(IdempotencyKeys)
+        .where(IdempotencyKeys.user_id == user_id, IdempotencyKeys.key == key)
+        .values(response=encoded)
+    )
+    return encoded
+
+
+def purge_expired_idempotency_keys():
+    db = SessionLocal()
+    try:
+        result = db.execute(delete(IdempotencyKeys).where(IdempotencyKeys.expires_at < func.now()))
+        db.commit()
+        if result.rowcount:
+            logger.info("Purged %d expired idempotency keys", result.rowcount)
+    finally:
+        db.close()
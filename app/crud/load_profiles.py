@@ -0,0 +1,56 @@
+# app/crud/load_profiles.py
+from typing import Optional, Type
+from sqlalchemy import inspect
+from sqlalchemy.orm import lazyload, raiseload, selectinload
+
+# Named relationship loading profiles applied per query on top of the
+# lazy='joined' defaults declared in app/models.
+#
+#   auth   - the row itself; relationships load lazily only if touched
+#            (current user lookups - the instance stays in the request's
+#            session, so later access must still work)
+#   list   - the row plus its many-to-one references, one IN query each
+#   detail - the row plus every direct relationship, one IN query each
+#
+# Relationships that list/detail do not load are raiseload, so they never
+# end up in a cartesian LEFT OUTER JOIN and never lazy-load by accident.
+
+
+def _auth_options(model: Type):
+    return [lazyload("*")]
+
+
+def _list_options(model: Type):
+    options = [
+        selectinload(getattr(model, rel.key)).raiseload("*")
+        for rel in inspect(model).relationships
+        if not rel.uselist
+    ]
+    options.append(raiseload("*"))
+    return options
+
+
+def _detail_options(model: Type):
+    return [
+        selectinload(getattr(model, rel.key)).raiseload("*")
+        for rel in inspect(model).relationships
+    ]
+
+
+LOAD_PROFILES = {
+    "auth": _auth_options,
+    "list": _list_options,
+    "detail": _detail_options,
+}
+
+
+def load_options(model: Type, profile: Optional[str]):
+    """Loader options for a profile name; None keeps the model defaults"""
+    if profile is None:
+        return []
+
+    builder = LOAD_PROFILES.get(profile)
+    if builder is None:
+        raise ValueError(f"Unknown load profile: {profile}")
+
+    return builder(model)
@@ -1,100 +1,220 @@
 
 # -------------------- CHECK AVAILABILITY -------------------------
+import base64
 from datetime import date, timedelta
-from typing import Type
-from app.crud.generic_crud import get_records
+from typing import List, Optional, Type
+import numpy as np
+from app.crud.generic_crud import get_records, execute_query
 from fastapi import HTTPException
 from requests import Session
-from app.models.Enum import BookingStatusEnum
-from app.models.bookings import Bookings
+from sqlalchemy import Date, and_, cast, func, select, text, true
+from app.models.Enum import AvailabilityFormatEnum, RoomStatusEnum
+from app.models.bookings import Bookings, OCCUPYING_STATUSES
 from app.models.rooms import Rooms
 from app.models.room_type import RoomTypeWithSizes
-from sqlalchemy.exc import SQLAlchemyError
+from app.models.floor import Floors
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from app.services.availability_index import availability_index
+
+# SQLSTATE raised by exclude_overlapping_room_bookings
+EXCLUSION_VIOLATION = "23P01"
+
+
+def overlapping_bookings(check_in: date, check_out: date):
+    """Occupying bookings whose stay_range overlaps [check_in, check_out) - served by the GiST index"""
+    return and_(
+        Bookings.stay_range.op("&&")(func.daterange(check_in, check_out, "[)")),
+        Bookings.booking_status.in_(OCCUPYING_STATUSES)
+    )
+
+
+def is_overlap_violation(error: IntegrityError):
+    orig = error.orig
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    if code is None:
+        code = getattr(getattr(orig, "__cause__", None), "sqlstate", None)
+    return code == EXCLUSION_VIOLATION
 
 
-def check_availability(model: Type, db: Session,**kwargs):
-    room_id = kwargs.get('room_id')
-    check_in = kwargs.get('check_in')
-    check_out = kwargs.get('check_out')
-    
-    if not (room_id and check_in and check_out):
-        raise ValueError("room_id, check_in, and check_out are required")
-    
-    overlap_booking = db.query(model).filter(
-        model.room_id == room_id,
-        model.check_in < check_out,
-        model.check_out > check_in,
-        model.booking_status == BookingStatusEnum.CONFIRMED.value
-    ).first()
-
-    return overlap_booking is None
-    
 #-------------------- AVAILABLE DATE TO BOOK FOR A ROOM --------------------
-def available_date_of_room(room_id : int,model: Type, db: Session):
+AVAILABILITY_WINDOW_DAYS = 90
+
+
+def free_day_masks(room_ids: List[int], start: date, end: date, db: Session) -> dict:
+    """Boolean mask of free nights in [start, end) per room - from the index, else one SQL query for the rest"""
+    masks = {}
+    missing = []
+    for room_id in room_ids:
+        free = availability_index.free_days(room_id, start, end)
+        if free is None:
+            missing.append(room_id)
+        else:
+            masks[room_id] = free
+
+    if missing:
+        for room_id in missing:
+            masks[room_id] = np.ones((end - start).days, dtype=bool)
+        room_booked_insances = db.query(Bookings.room_id, Bookings.check_in, Bookings.check_out).filter(
+            Bookings.room_id.in_(missing),
+            Bookings.check_out > start,
+            Bookings.check_in < end,
+            Bookings.booking_status.in_(OCCUPYING_STATUSES)
+        ).all()
+        for rb in room_booked_insances:
+            masks[rb.room_id][max((rb.check_in - start).days, 0):(rb.check_out - start).days] = False
+
+    return masks
+
+
+def encode_availability(free: np.ndarray, start: date, format: AvailabilityFormatEnum):
+    """Render a free-night mask starting at `start` as dates, [start, end) runs or a base64 bitmap"""
+    if format == AvailabilityFormatEnum.BITMAP:
+        return base64.b64encode(np.packbits(free).tobytes()).decode("ascii")
+
+    if format == AvailabilityFormatEnum.RUNS:
+        # Edges of the mask padded with False: rising edges start runs, falling edges end them
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], free, [False])).astype(np.int8)))
+        return [
+            [str(start + timedelta(days=int(run_start))), str(start + timedelta(days=int(run_end)))]
+            for run_start, run_end in zip(edges[::2], edges[1::2])
+        ]
+
+    return [str(start + timedelta(days=int(offset))) for offset in np.flatnonzero(free)]
+
+
+def available_date_of_room(room_id : int,model: Type, db: Session, format: AvailabilityFormatEnum = AvailabilityFormatEnum.DATES):
     
     today = date.today()
-    future_limit = today + timedelta(days=90) 
-    
-    room_booked_insances = db.query(model).filter(model.room_id == room_id , model.check_out >= today).all()
-    
+    future_limit = today + timedelta(days=AVAILABILITY_WINDOW_DAYS)
     
-    all_dates = set()
-    current_date = today
-
-    while current_date <= future_limit:
-        all_dates.add(current_date)
-        current_date += timedelta(days=1)
-
-    booked_dates = set()
-    for rb in room_booked_insances:
-        current_date = max(rb.check_in, today)
-        while current_date < rb.check_out: 
-            booked_dates.add(current_date)
-            current_date += timedelta(days=1)
-   
-    available_dates = sorted(list(all_dates - booked_dates))
-
-    if not available_dates:
+    free = free_day_masks([room_id], today, future_limit + timedelta(days=1), db)[room_id]
+
+    if not free.any():
         raise HTTPException(status_code=404, detail="No available dates found for this room")
 
     return {
         "room_id": room_id,
         "from": str(today),
         "to": str(future_limit),
-        "available_dates": [str(d) for d in available_dates]
+        "format": format.value,
+        "available_dates": encode_availability(free, today, format)
+    }
+
+
+def available_dates_of_rooms(room_ids: List[int], db: Session, format: AvailabilityFormatEnum = AvailabilityFormatEnum.RUNS):
+    """Availability of many rooms over the same window in one call; rooms with no free night get an empty encoding"""
+    known = {room_id for (room_id,) in db.query(Rooms.id).filter(Rooms.id.in_(room_ids))}
+    unknown = [room_id for room_id in room_ids if room_id not in known]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Rooms not found: {unknown}")
+
+    today = date.today()
+    future_limit = today + timedelta(days=AVAILABILITY_WINDOW_DAYS)
+
+    masks = free_day_masks(room_ids, today, future_limit + timedelta(days=1), db)
+
+    return {
+        "from": str(today),
+        "to": str(future_limit),
+        "format": format.value,
+        "rooms": [
+            {"room_id": room_id, "available_dates": encode_availability(masks[room_id], today, format)}
+            for room_id in room_ids
+        ]
     }
       
 
 #-------------------- AVAILABLE ROOMS ----------------------
-def available_rooms(db: Session, check_in: date, check_out: date, no_of_child: int, no_of_adult: int):
+def available_rooms_query(
+    check_in: date,
+    check_out: date,
+    no_of_child: int = 0,
+    no_of_adult: int = 1,
+    room_type_id: Optional[int] = None,
+    floor_no: Optional[int] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None
+):
+    """Candidate rooms with no overlapping occupying booking, as one NOT EXISTS anti-join"""
+    booked = (
+        select(Bookings.id)
+        .where(Bookings.room_id == Rooms.id, overlapping_bookings(check_in, check_out))
+        .exists()
+    )
+
+    conditions = [
+        ~booked,
+        Rooms.status == RoomStatusEnum.AVAILABLE,
+        RoomTypeWithSizes.no_of_adult >= no_of_adult,
+        RoomTypeWithSizes.no_of_child >= no_of_child
+    ]
+    if room_type_id is not None:
+        conditions.append(Rooms.room_type_id == room_type_id)
+    if floor_no is not None:
+        conditions.append(Floors.floor_no == floor_no)
+    if min_price is not None:
+        conditions.append(RoomTypeWithSizes.base_price >= min_price)
+    if max_price is not None:
+        conditions.append(RoomTypeWithSizes.base_price <= max_price)
+    if after_id is not None:
+        conditions.append(Rooms.id > after_id)
+
+    statement = (
+        select(
+            Rooms.id.label("room_id"),
+            Rooms.room_no,
+            Floors.floor_no,
+            RoomTypeWithSizes.id.label("room_type_id"),
+            RoomTypeWithSizes.room_name,
+            RoomTypeWithSizes.base_price,
+            RoomTypeWithSizes.no_of_adult,
+            RoomTypeWithSizes.no_of_child
+        )
+        .join(RoomTypeWithSizes, Rooms.room_type_id == RoomTypeWithSizes.id)
+        .join(Floors, Rooms.floor_id == Floors.id)
+        .where(*conditions)
+        .order_by(Rooms.id)
+    )
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+async def available_rooms(
+    db: Session,
+    check_in: date,
+    check_out: date,
+    no_of_child: int = 0,
+    no_of_adult: int = 1,
+    room_type_id: Optional[int] = None,
+    floor_no: Optional[int] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: int = 50
+):
     try:
         if check_in >= check_out:
             raise HTTPException(status_code=400, detail="Invalid date range")
 
-        # Find booked rooms in the given period
-        booked_room = (
-            db.query(Bookings)
-            .join(Rooms, Bookings.room_id == Rooms.id)
-            .join(RoomTypeWithSizes, Rooms.room_type_id == RoomTypeWithSizes.id)
-            .filter(
-                Bookings.check_in < check_out,
-                Bookings.check_out > check_in,
-                RoomTypeWithSizes.no_of_adult >= no_of_adult,
-                RoomTypeWithSizes.no_of_child >= no_of_child
-            )
-            .distinct()
-            .all()
+        statement = available_rooms_query(
+            check_in, check_out, no_of_child, no_of_adult,
+            room_type_id=room_type_id, floor_no=floor_no,
+            min_price=min_price, max_price=max_price,
+            after_id=after_id, limit=limit + 1
         )
+        result = await execute_query(db, statement)
+        rows = [dict(row) for row in result.mappings().all()]
 
-        # Safely extract room IDs
-        booked_room_ids = [r.room_id for r in booked_room]
-
-        # Fetch rooms not booked in that range
-        available_rooms_list = db.query(Rooms).filter(Rooms.id.notin_(booked_room_ids)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
         return {
-            "available_rooms": [room.id for room in available_rooms_list],
-            "count": len(available_rooms_list)
+            "available_rooms": rows,
+            "count": len(rows),
+            "next_after_id": rows[-1]["room_id"] if has_more else None
         }
 
     except SQLAlchemyError as e:
@@ -105,4 +225,37 @@ def available_rooms(db: Session, check_in: date, check_out: date, no_of_child: i
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
     
-    
\ No newline at end of file
+    
+
+# -------------------- PRICE CALENDAR -------------------------
+async def available_inventory_by_day(db: Session, start: date, end: date, no_of_adult: int = 1, no_of_child: int = 0):
+    """(day, room_type_id, base_price, free rooms) for every night in [start, end), in one generate_series pass"""
+    days = select(
+        cast(func.generate_series(start, end - timedelta(days=1), text("interval '1 day'")), Date).label("day")
+    ).cte("days")
+
+    occupied = (
+        select(Bookings.id)
+        .where(
+            Bookings.room_id == Rooms.id,
+            Bookings.stay_range.op("@>")(days.c.day),
+            Bookings.booking_status.in_(OCCUPYING_STATUSES)
+        )
+        .exists()
+    )
+
+    statement = (
+        select(days.c.day, Rooms.room_type_id, RoomTypeWithSizes.base_price, func.count(Rooms.id).label("free_rooms"))
+        .select_from(days)
+        .join(Rooms, true())
+        .join(RoomTypeWithSizes, Rooms.room_type_id == RoomTypeWithSizes.id)
+        .where(
+            ~occupied,
+            Rooms.status == RoomStatusEnum.AVAILABLE,
+            RoomTypeWithSizes.no_of_adult >= no_of_adult,
+            RoomTypeWithSizes.no_of_child >= no_of_child
+        )
+        .group_by(days.c.day, Rooms.room_type_id, RoomTypeWithSizes.base_price)
+        .order_by(days.c.day)
+    )
+    return (await execute_query(db, statement)).all()
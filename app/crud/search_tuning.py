@@ -0,0 +1,82 @@
+# app/crud/search_tuning.py
+import time
+from typing import List, Optional
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.crud.generic_crud import trigram_threshold_for
+from app.services.search_cache import SEARCH_DEPENDENCIES
+from app.services.suggest_index import suggest_index
+
+settings = get_settings()
+
+DEFAULT_THRESHOLDS = [0.2, 0.3, 0.4, 0.5, 0.6, 0.7]
+DEFAULT_SAMPLE_SIZE = 20
+
+
+def sample_queries(limit: int = DEFAULT_SAMPLE_SIZE) -> List[str]:
+    """Popular terms plus a one-letter-dropped typo of each longer one"""
+    terms = suggest_index.popular_terms(limit)
+    typos = [term[:len(term) // 2] + term[len(term) // 2 + 1:] for term in terms if len(term) >= 5]
+    return terms + typos
+
+
+def trigram_tuning_report(db: Session, table: str, thresholds: Optional[List[float]] = None, queries: Optional[List[str]] = None):
+    """
+    Recall and latency of `q <% search_text` for each word_similarity threshold.
+
+    Recall is measured against the loosest threshold tested: every stricter
+    threshold returns a subset, so it shows what each step up gives away.
+    Thresholds are applied with SET LOCAL and rolled back afterwards, so the
+    connection keeps the values set on connect.
+    """
+    if table not in SEARCH_DEPENDENCIES:
+        raise HTTPException(status_code=400, detail=f"Unsupported search table: {table}")
+
+    # pg_trgm rejects values outside [0, 1] (NaN fails both comparisons too)
+    invalid = [value for value in thresholds or [] if not 0 <= value <= 1]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Thresholds must be between 0 and 1: {invalid}")
+
+    thresholds = sorted(set(thresholds or DEFAULT_THRESHOLDS))
+    queries = queries or sample_queries()
+    if not queries:
+        raise HTTPException(status_code=400, detail="No sample queries given and the suggest index is empty")
+
+    statement = text(f"SELECT id FROM {table} WHERE :q <% search_text")
+    matches = {}
+    latencies = {}
+    try:
+        for threshold in thresholds:
+            db.execute(text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"), {"threshold": str(threshold)})
+            for q in queries:
+                started = time.perf_counter()
+                ids = {row_id for (row_id,) in db.execute(statement, {"q": q})}
+                latencies.setdefault(threshold, []).append((time.perf_counter() - started) * 1000)
+                matches[threshold, q] = ids
+    finally:
+        db.rollback()
+
+    loosest = thresholds[0]
+    report = []
+    for threshold in thresholds:
+        found = sum(len(matches[threshold, q]) for q in queries)
+        baseline = sum(len(matches[loosest, q]) for q in queries)
+        timings = np.array(latencies[threshold])
+        report.append({
+            "threshold": threshold,
+            "avg_matches": round(found / len(queries), 2),
+            "recall": round(found / baseline, 4) if baseline else None,
+            "zero_result_queries": sum(1 for q in queries if not matches[threshold, q]),
+            "avg_latency_ms": round(float(timings.mean()), 3),
+            "p95_latency_ms": round(float(np.percentile(timings, 95)), 3),
+        })
+
+    return {
+        "table": table,
+        "configured_threshold": trigram_threshold_for(table),
+        "queries": queries,
+        "thresholds": report,
+    }
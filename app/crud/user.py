@@ -22,6 +22,7 @@ from io import BytesIO
 from typing import Optional, Union, Dict
 from passlib.context import CryptContext
 from app.utils import get_role
+from app.crud.load_profiles import load_options
 
 # -------------------------------
 #  USER CORE OPERATIONS
@@ -90,7 +91,7 @@ def get_user_by_phoneno(db: Session, phone_no: int):
 
 
 def list_users(db: Session):
-    return db.query(Users).all()
+    return db.query(Users).options(*load_options(Users, "list")).all()
 
 
 def delete_user(db: Session, user_id: str):
@@ -143,9 +144,9 @@ def login_by_phoneno_or_email(user_ : str, password : str, db: Session) -> Dict:
     
     existing_user = None
     if re.match(EMAIL_REGEX, user_) is not None:
-        existing_user = db.query(Users).filter(Users.email == user_).first()
+        existing_user = db.query(Users).options(*load_options(Users, "auth")).filter(Users.email == user_).first()
     elif re.match(PHONE_REGEX, user_) is not None:
-        existing_user = db.query(Users).filter(Users.phone_no == user_).first()
+        existing_user = db.query(Users).options(*load_options(Users, "auth")).filter(Users.phone_no == user_).first()
     
     if existing_user is None:
         raise ValueError("Invalid user Detail")
@@ -192,7 +193,7 @@ def login_by_phoneno_or_email(user_ : str, password : str, db: Session) -> Dict:
 
 def refresh_access_token(db: Session, user_id: str) -> Dict[str, str]:
     """Generate new access token using refresh token."""
-    user = db.query(Users).filter(Users.id == user_id).first()
+    user = db.query(Users).options(*load_options(Users, "auth")).filter(Users.id == user_id).first()
     role = get_role(db,user.role_id)
 
     if not user:
@@ -2,9 +2,22 @@
 from fastapi import FastAPI 
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.core.database_postgres import init_db
-from app.routes import users,userQueryChat,generalQuery,feature,room_type_with_size,bed_type,floor,room,addon,booking,reviewsRatings
+from app.core.config import get_settings
+from app.core.database_postgres import init_db, async_engine, async_replica_engine
+from app.core.sql_instrumentation import SQLInstrumentationMiddleware
+from app.core import background
+from app.core.table_listener import table_listener
+from app.services.availability_index import availability_index, AVAILABILITY_INDEX_TABLES
+from app.services.room_type_index import room_type_index, ROOM_TYPE_INDEX_TABLES
+from app.services.rate_engine import rate_engine, RATE_ENGINE_TABLES
+from app.services.price_calendar import price_calendar_cache, PRICE_CALENDAR_TABLES
+from app.services.search_cache import search_cache, WATCHED_TABLES
+from app.services.suggest_index import suggest_index, SUGGEST_SOURCES
+from app.crud.idempotency import purge_expired_idempotency_keys
+from app.crud.booking import expire_stale_holds
+from app.routes import users,userQueryChat,generalQuery,feature,room_type_with_size,bed_type,floor,room,addon,booking,reviewsRatings,admin,pricing,search
 
+settings = get_settings()
 
 # Create FastAPI instance
 application = FastAPI(
@@ -21,18 +34,90 @@ application.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    application.add_middleware(SQLInstrumentationMiddleware)
+
 # Startup event
 @application.on_event("startup")
 def on_startup():
     """Initialize database on startup"""
     init_db()
     print("Database initialized")
+    room_type_index.refresh()
+    table_listener.subscribe(ROOM_TYPE_INDEX_TABLES, room_type_index.mark_stale)
+    background.start_periodic(
+        "room_type_index_sync",
+        settings.TABLE_CHANGE_SYNC_SECONDS,
+        room_type_index.sync
+    )
+    background.start_periodic(
+        "room_type_index_refresh",
+        settings.ROOM_TYPE_INDEX_REFRESH_SECONDS,
+        room_type_index.refresh
+    )
+    rate_engine.refresh()
+    table_listener.subscribe(RATE_ENGINE_TABLES, rate_engine.mark_stale)
+    background.start_periodic(
+        "rate_engine_sync",
+        settings.TABLE_CHANGE_SYNC_SECONDS,
+        rate_engine.sync
+    )
+    background.start_periodic(
+        "rate_engine_refresh",
+        settings.RATE_ENGINE_REFRESH_SECONDS,
+        rate_engine.refresh
+    )
+    if settings.AVAILABILITY_INDEX_ENABLED:
+        availability_index.refresh()
+        table_listener.subscribe(AVAILABILITY_INDEX_TABLES, availability_index.mark_stale)
+        background.start_periodic(
+            "availability_index_sync",
+            settings.TABLE_CHANGE_SYNC_SECONDS,
+            availability_index.sync
+        )
+        background.start_periodic(
+            "availability_index_refresh",
+            settings.AVAILABILITY_INDEX_REFRESH_SECONDS,
+            availability_index.refresh
+        )
+    background.start_periodic(
+        "idempotency_key_cleanup",
+        settings.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS,
+        purge_expired_idempotency_keys
+    )
+    background.start_periodic(
+        "booking_hold_reaper",
+        settings.BOOKING_HOLD_REAPER_INTERVAL_SECONDS,
+        expire_stale_holds
+    )
+    if settings.SEARCH_CACHE_ENABLED:
+        table_listener.subscribe(WATCHED_TABLES, search_cache.invalidate)
+    table_listener.subscribe(PRICE_CALENDAR_TABLES, price_calendar_cache.invalidate)
+    suggest_index.refresh()
+    table_listener.subscribe(SUGGEST_SOURCES, suggest_index.mark_dirty)
+    background.start_periodic(
+        "suggest_index_sync",
+        settings.SUGGEST_INDEX_SYNC_SECONDS,
+        suggest_index.sync
+    )
+    background.start_periodic(
+        "suggest_index_refresh",
+        settings.SUGGEST_INDEX_REFRESH_SECONDS,
+        suggest_index.refresh
+    )
+    table_listener.start()
     print("Server running with cookie-based authentication")
 
 # Shutdown event
 @application.on_event("shutdown")
-def on_shutdown():
+async def on_shutdown():
     """Cleanup on shutdown"""
+    await background.stop_all()
+    table_listener.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
     print("Shutting down server...")
 
 application.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -49,6 +134,9 @@ application.include_router(booking.router)
 application.include_router(reviewsRatings.router)
 application.include_router(userQueryChat.router)
 application.include_router(generalQuery.router)
+application.include_router(admin.router)
+application.include_router(pricing.router)
+application.include_router(search.router)
 
 
 # Root endpoint
@@ -26,3 +26,22 @@ class RefundStatusEnum(str, enum.Enum):
     APPROVED = "approved"             # Refund request approved by admin
     REJECTED = "rejected"             # Refund request denied
     COMPLETED = "completed"           # Refund has been successfully completed
+
+
+class GroupBookingPolicyEnum(str, enum.Enum):
+    """How a group booking handles rooms that cannot be booked"""
+    ALL_OR_NOTHING = "all_or_nothing" # Reject the whole group if any room is unavailable
+    PARTIAL = "partial"               # Book what is available, report the rest
+
+
+class AvailabilityFormatEnum(str, enum.Enum):
+    """Encoding of a room's free nights in availability responses"""
+    DATES = "dates"                   # One ISO date string per free night
+    RUNS = "runs"                     # Half-open [start, end) ranges of consecutive free nights
+    BITMAP = "bitmap"                 # Base64 of one bit per night, most significant bit first
+
+
+class SearchModeEnum(str, enum.Enum):
+    """Ranking strategy of generic search"""
+    HYBRID = "hybrid"                 # One query blending full-text rank and trigram similarity
+    CASCADE = "cascade"               # Full-text, then trigram, then ILIKE until a tier matches
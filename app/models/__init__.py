@@ -82,6 +82,8 @@ from app.models.user_profile import Profiles
 from app.models.roomType_bedType import RoomTypeBedTypes
 from app.models.booking_addon import BookingAddons
 from app.models.reschedule import Reschedules
+from app.models.idempotency import IdempotencyKeys
+from app.models.rate_plan import RatePlans, RateSeasons
 
 __all__ = [
     "Base",
@@ -117,5 +119,8 @@ __all__ = [
     "RoomTypeBedTypes",
     "BookingAddons",
     "Reschedules",
+    "IdempotencyKeys",
+    "RatePlans",
+    "RateSeasons",
 
 ]
\ No newline at end of file
@@ -1,9 +1,13 @@
 # app/models/bookings.py
-from sqlalchemy import Column, Integer, DateTime, Date, func, ForeignKey, CheckConstraint, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, DateTime, Date, func, ForeignKey, CheckConstraint, Computed, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import DATERANGE, ExcludeConstraint
+from sqlalchemy.orm import relationship, deferred
 from app.core.database_postgres import Base
 from app.models.Enum import BookingStatusEnum, PaymentStatusEnum
 
+# Booking statuses that hold a room for their stay_range (PENDING = timed hold)
+OCCUPYING_STATUSES = (BookingStatusEnum.CONFIRMED, BookingStatusEnum.PENDING)
+
 
 class Bookings(Base):
     __tablename__ = "bookings"
@@ -21,6 +25,11 @@ class Bookings(Base):
     )
     check_in = Column(Date, nullable=False)
     check_out = Column(Date, nullable=False)
+    # Half-open [check_in, check_out) range, maintained by Postgres
+    stay_range = deferred(Column(
+        DATERANGE,
+        Computed("daterange(check_in, check_out, '[)')", persisted=True)
+    ))
     total_amount = Column(Integer, nullable=False)
     booking_status = Column(
         SQLEnum(BookingStatusEnum, name="booking_status_enum", create_type=False),
@@ -32,6 +41,8 @@ class Bookings(Base):
         nullable=False,
         default=PaymentStatusEnum.PAID.value
     )
+    # Set while the booking is a PENDING hold; the reaper cancels it once passed
+    hold_expires_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True),
@@ -103,4 +114,19 @@ class Bookings(Base):
             "total_amount >= 0",
             name="check_total_amount_non_negative"
         ),
+        # Two occupying bookings of the same room can never overlap (needs btree_gist).
+        # The GiST index behind it also serves room/date overlap scans.
+        ExcludeConstraint(
+            ("room_id", "="),
+            ("stay_range", "&&"),
+            name="exclude_overlapping_room_bookings",
+            using="gist",
+            where=booking_status.in_(OCCUPYING_STATUSES)
+        ),
+        # Reaper scan: only live holds are indexed
+        Index(
+            "ix_bookings_pending_hold_expiry",
+            "hold_expires_at",
+            postgresql_where=booking_status == BookingStatusEnum.PENDING
+        ),
     )
\ No newline at end of file
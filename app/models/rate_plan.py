@@ -0,0 +1,65 @@
+# app/models/rate_plan.py
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, CheckConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB
+from app.core.database_postgres import Base
+
+
+class RatePlans(Base):
+    """Weekend and length-of-stay rules for one room type (base_price stays the default nightly rate)"""
+    __tablename__ = "rate_plans"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
+    room_type_id = Column(
+        Integer,
+        ForeignKey("room_type_with_sizes.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+    weekend_multiplier = Column(Float, nullable=False, default=1.0)
+    # Nights (Python weekday numbers, Monday = 0) charged at the weekend multiplier
+    weekend_days = Column(JSONB, nullable=False, default=lambda: [4, 5])
+    # {"<min nights>": <fraction off>}, e.g. {"7": 0.1, "14": 0.15}
+    los_discounts = Column(JSONB, nullable=False, default=dict)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "weekend_multiplier > 0 AND weekend_multiplier <= 10",
+            name="check_weekend_multiplier_range"
+        ),
+    )
+
+
+class RateSeasons(Base):
+    """Nightly rate override for a room type over [start_date, end_date)"""
+    __tablename__ = "rate_seasons"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
+    room_type_id = Column(
+        Integer,
+        ForeignKey("room_type_with_sizes.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    season_name = Column(String(100), nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    nightly_rate = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint(
+            "end_date > start_date",
+            name="check_season_end_after_start"
+        ),
+        CheckConstraint(
+            "nightly_rate > 0 AND nightly_rate <= 1000000",
+            name="check_nightly_rate_range"
+        ),
+    )
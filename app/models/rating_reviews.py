@@ -22,6 +22,8 @@ class RatingsReviews(Base):
       String,
       nullable=False
     )
+    # Copy of the Mongo document's rating so room filters can aggregate it in SQL
+    ratings = Column(Integer, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
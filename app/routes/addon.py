@@ -4,11 +4,11 @@ from sqlalchemy.orm import Session
 from app.schemas.addon_schema import AddonSchema
 from app.models.addon import Addons
 from app.models.user import Users
-from app.core.dependency import get_current_user, get_db
+from app.core.dependency import get_current_user, get_async_db
 from app.crud.generic_crud import (
     insert_record,
-    update_record,
-    delete_record,
+    update_record_returning,
+    delete_record_returning,
     save_image,
     get_record,
 )
@@ -23,7 +23,7 @@ async def add_addon(
     addon_name: str = Form(...),
     base_price: int = Form(...),
     image: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     sub_static_dir = "addon_images"
@@ -48,7 +48,7 @@ async def add_addon(
 async def update_addon_image(
     addon_id: int = Form(...),
     image: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     instance = await get_record(model=Addons, db=db, id=addon_id)
@@ -67,7 +67,7 @@ async def update_addon_image(
         sub_static_dir = "addon_images"
         image_url = await save_image(image, sub_static_dir)
 
-        updated_addon = await update_record(
+        updated_addon = await update_record_returning(
             id=addon_id,
             model=Addons,
             db=db,
@@ -84,20 +84,16 @@ async def update_addon_details(
     addon_id: int = Form(...),
     addon_name: Optional[str] = Form(None),
     base_price: Optional[int] = Form(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
-    instance = await get_record(model=Addons, db=db, id=addon_id)
-    if not instance:
-        raise HTTPException(status_code=404, detail="Addon not found")
-
     updated_data = {}
     if addon_name:
         updated_data["addon_name"] = addon_name
     if base_price is not None:
         updated_data["base_price"] = base_price
 
-    updated_addon = await update_record(
+    updated_addon = await update_record_returning(
         id=addon_id,
         model=Addons,
         db=db,
@@ -111,13 +107,13 @@ async def update_addon_details(
 @router.delete("/delete")
 async def delete_addon(
     addon_id: int = Form(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
-    deleted_addon = await delete_record(
-        id=addon_id,
+    await delete_record_returning(
         model=Addons,
         db=db,
+        id=addon_id,
     )
     return {"message": f"Addon with ID {addon_id} deleted successfully"}
 
@@ -126,7 +122,7 @@ async def delete_addon(
 @router.get("/get", response_model=AddonSchema)
 async def get_addon(
     addon_name: str = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     addon = await get_record(model=Addons, db=db, addon_name=addon_name)
@@ -0,0 +1,63 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.core.database_postgres import engine, async_engine, replica_engine, async_replica_engine, replica_health, settings
+from app.core.dependency import get_current_admin, get_read_db
+from app.core.pool_monitor import pool_status
+from app.core.slow_query_log import slow_query_store
+from app.crud.search_tuning import trigram_tuning_report
+from app.models.user import Users
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+# ------------------ CONNECTION POOL STATISTICS ------------------
+@router.get("/pool")
+async def get_pool_statistics(
+    current_user: Users = Depends(get_current_admin),
+):
+    """Checked-out, idle and overflow connections plus cumulative checkout wait"""
+    pools = {"primary": pool_status(engine.pool)}
+    if async_engine is not None:
+        pools["primary_async"] = pool_status(async_engine.sync_engine.pool)
+    if replica_engine is not None:
+        pools["replica"] = pool_status(replica_engine.pool)
+    if async_replica_engine is not None:
+        pools["replica_async"] = pool_status(async_replica_engine.sync_engine.pool)
+
+    return {
+        "max_connections_per_engine": settings.POSTGRES_POOL_SIZE + settings.POSTGRES_MAX_OVERFLOW,
+        "pools": pools,
+        "replica_lag_seconds": replica_health.lag,
+    }
+
+
+# ------------------ SLOW QUERIES ------------------
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(10, ge=1, le=100),
+    current_user: Users = Depends(get_current_admin),
+):
+    """Top-N slowest statement fingerprints with counts, p50/p95 and captured plan"""
+    return slow_query_store.top(limit)
+
+
+@router.delete("/slow-queries")
+async def clear_slow_queries(
+    current_user: Users = Depends(get_current_admin),
+):
+    slow_query_store.clear()
+    return {"message": "Slow query log cleared"}
+
+
+# ------------------ SEARCH TUNING ------------------
+@router.get("/search-tuning")
+def get_search_tuning(
+    table: str = Query("rooms"),
+    thresholds: Optional[List[float]] = Query(None),
+    queries: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: Users = Depends(get_current_admin),
+):
+    """Recall versus latency of each trigram threshold on a table; sample queries default to popular terms"""
+    return trigram_tuning_report(db, table, thresholds, queries)
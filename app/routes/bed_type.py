@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, Form, Query, HTTPException
 from sqlalchemy.orm import Session
 from typing import Optional
-from app.core.dependency import get_db, get_current_user
+from app.core.dependency import get_async_db, get_current_user
 from app.models.user import Users
 from app.models.bed_type import BedTypes
 from app.schemas.bed_type_schema import BedTypeSchema
-from app.crud.generic_crud import insert_record, delete_record, get_record_by_id, get_record, update_record
+from app.crud.generic_crud import insert_record, delete_record_returning, get_record_by_id, get_record, update_record
+from app.services.room_type_index import room_type_index
 
 router = APIRouter(prefix="/bedtype", tags=["Bed Types"])
 
@@ -14,7 +15,7 @@ router = APIRouter(prefix="/bedtype", tags=["Bed Types"])
 @router.post("/add", response_model=BedTypeSchema)
 async def add_bed_type(
     bed_type_name: str = Form(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     bed_data = BedTypeSchema(bed_type_name=bed_type_name)
@@ -24,6 +25,7 @@ async def add_bed_type(
         model=BedTypes,
         **bed_data.model_dump(),
     )
+    await room_type_index.refresh_async()
     return new_bed_type
 
 
@@ -31,24 +33,15 @@ async def add_bed_type(
 @router.delete("/delete")
 async def delete_bed_type(
     bed_type_name: str = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
-    # Find the record first
-    record = await get_record(
+    await delete_record_returning(
         db=db,
         model=BedTypes,
         bed_type_name=bed_type_name
     )
-
-    if not record:
-        raise HTTPException(status_code=404, detail="Bed type not found")
-
-    await delete_record(
-        db=db,
-        model=BedTypes,
-        id=record.id
-    )
+    await room_type_index.refresh_async()
 
     return {"message": f"Bed type '{bed_type_name}' deleted successfully"}
 
@@ -57,7 +50,7 @@ async def delete_bed_type(
 @router.get("/get")
 async def get_bed_type(
     bed_type_name: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     if bed_type_name:
@@ -1,10 +1,12 @@
 from datetime import date, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, Form
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Form
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
-from app.models.Enum import BookingStatusEnum, PaymentStatusEnum, RefundStatusEnum, RoomStatusEnum
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from datetime import datetime, timezone
+from app.core.config import get_settings
+from app.models.Enum import AvailabilityFormatEnum, BookingStatusEnum, PaymentStatusEnum, RefundStatusEnum, RoomStatusEnum
 from app.models.reschedule import Reschedules
 from app.models.rooms import Rooms
 from app.models.user import Users
@@ -13,177 +15,313 @@ from app.models.booking_status_history import BookingStatusHistory
 from app.models.room_type import RoomTypeWithSizes
 from app.models.payment import Payments
 from app.models.refund import Refunds
-from app.models.addon import Addons
 from app.models.booking_addon import BookingAddons
 from app.schemas.payment_schema import PaymentBase
 from app.schemas.status_history_schema import BookingStatusHistoryBase
-from app.schemas.booking_schema import BookingBase
-from app.core.dependency import get_db, get_current_user
-from app.crud.generic_crud import insert_record, get_record, get_record_by_id, insert_record_flush, commit_db
-from app.crud.rooms import available_rooms, available_date_of_room, check_availability
+from app.schemas.booking_schema import BookingBase, GroupBookingRequest
+from app.core.dependency import get_async_db, get_read_db, get_async_read_db, get_current_user
+from app.crud.generic_crud import insert_record, get_record, get_record_by_id, flush_db, refresh_db, rollback_db, execute_query, unit_of_work, returning_columns
+from app.crud.rooms import available_rooms, available_date_of_room, available_dates_of_rooms, is_overlap_violation
+from app.crud.booking import (
+    whole_filter,
+    parse_addon_list,
+    addon_prices,
+    create_group_booking,
+    stay_amount,
+    insert_addons_and_payment,
+    confirm_hold,
+    release_hold,
+)
+from app.crud.idempotency import claim_idempotency_key, save_idempotent_response, request_fingerprint
+from app.services import booking_events
 
 router = APIRouter(prefix="/booking", tags=["Bookings"])
+settings = get_settings()
+
+# Everything but the generated stay_range, which only backs the exclusion constraint
+BOOKING_COLUMNS = returning_columns(Bookings)
 
 
 @router.post("/add")
 async def book_room(
     booking: BookingBase,
     addon_list: Optional[List[str]] = None,
-    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=100),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     """Add a new room record"""
     try:
-        room_instance = await get_record_by_id(db=db, model=Rooms, id=booking.room_id)
-        if not room_instance:
-            raise HTTPException(status_code=404, detail="Room not found")
-
-        root_type_instance = await get_record_by_id(db=db, model=RoomTypeWithSizes, id=room_instance.room_type_id)
-        if not root_type_instance:
-            raise HTTPException(status_code=404, detail="Room type not found")
-
-        available = check_availability(
-            db=db, model=Bookings, check_in=booking.check_in, check_out=booking.check_out, room_id=booking.room_id
-        )
-
-        if not available:
-            raise HTTPException(status_code=400, detail="The requested room is not available for this date")
-
-        from_date = booking.check_in
-        to_date = booking.check_out
-        no_of_days = (to_date - from_date).days
-        room_amount = no_of_days * root_type_instance.base_price
-
-        booking_instance = await insert_record_flush(
-            db=db, model=Bookings, **booking.model_dump(), total_amount=room_amount
-        )
-
-        addon_amount = 0
-        if addon_list and addon_list != ["string"]:
-            for addon in addon_list:
-                try:
-                    addon_id, quantity = addon.split(':')
-                except ValueError:
-                    raise HTTPException(status_code=400, detail=f"Invalid addon format: {addon}")
-
-                instance = await get_record_by_id(db=db, model=Addons, id=addon_id)
-                if not instance:
-                    raise HTTPException(status_code=404, detail=f"Addon with ID {addon_id} not found")
-
-                addon_amount += instance.base_price
-
-                dicts = {
-                    "booking_id": booking_instance.id,
-                    "addon_id": addon_id,
-                    "quantity": quantity
-                }
-                await insert_record(db=db, model=BookingAddons, **dicts)
-
-        total_amount = room_amount + addon_amount
-        payment_data_base = PaymentBase(
-            booking_id=booking_instance.id,
-            total_amount=total_amount,
-            status=PaymentStatusEnum.PAID.value
-        )
-
-        await insert_record(db=db, model=Payments, **payment_data_base.model_dump())
-        await commit_db(db)
-
-        result = await get_record_by_id(db=db, model=Bookings, id=booking_instance.id)
-        if not result:
-            raise HTTPException(status_code=500, detail="Failed to fetch booking after creation")
+        async with unit_of_work(db):
+            fingerprint = request_fingerprint("/booking/add", {"booking": booking, "addon_list": addon_list})
+            replay = await claim_idempotency_key(db, idempotency_key, current_user.id, "/booking/add", fingerprint)
+            if replay is not None:
+                return replay
+
+            from_date = booking.check_in
+            to_date = booking.check_out
+            room_amount = await stay_amount(db, booking.room_id, from_date, to_date)
+            if room_amount is None:
+                raise HTTPException(status_code=404, detail="Room not found")
+
+            addon_quantities = parse_addon_list(addon_list)
+            prices = await addon_prices(db, list(addon_quantities))
+
+            # exclude_overlapping_room_bookings rejects the insert if the room is taken
+            booking_row = (await execute_query(
+                db,
+                insert(Bookings)
+                .values(
+                    **booking.model_dump(exclude={"booking_status"}),
+                    booking_status=BookingStatusEnum.CONFIRMED,
+                    total_amount=room_amount
+                )
+                .returning(*BOOKING_COLUMNS)
+            )).mappings().one()
+
+            result = dict(booking_row)
+            result["addons"] = [
+                {"addon_id": addon_id, "quantity": quantity, "base_price": prices[addon_id]}
+                for addon_id, quantity in addon_quantities.items()
+            ]
+            result["payment"] = await insert_addons_and_payment(db, booking_row["id"], room_amount, addon_quantities, prices)
+            result = await save_idempotent_response(db, idempotency_key, current_user.id, result)
+
+        booking_events.booking_confirmed(booking.room_id, from_date, to_date)
+        return result
+
+    except IntegrityError as e:
+        await rollback_db(db)
+        if is_overlap_violation(e):
+            raise HTTPException(status_code=409, detail="The requested room is not available for this date")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except SQLAlchemyError as e:
+        await rollback_db(db)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        await rollback_db(db)
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+
+@router.post("/group")
+async def book_group(
+    group: GroupBookingRequest,
+    db: Session = Depends(get_async_db),
+    current_user: Users = Depends(get_current_user),
+):
+    """Book several rooms in one transaction, all-or-nothing or partially per `policy`"""
+    try:
+        async with unit_of_work(db):
+            result = await create_group_booking(db=db, request=group, user_id=current_user.id)
+
+        for booking in result["booked"]:
+            booking_events.booking_confirmed(booking["room_id"], booking["check_in"], booking["check_out"])
 
+        result["policy"] = group.policy
         return result
 
+    except IntegrityError as e:
+        await rollback_db(db)
+        if is_overlap_violation(e):
+            raise HTTPException(status_code=409, detail="A requested room was booked concurrently, please retry")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except SQLAlchemyError as e:
-        db.rollback()
+        await rollback_db(db)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await rollback_db(db)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
+@router.post("/hold")
+async def hold_room(
+    booking: BookingBase,
+    db: Session = Depends(get_async_db),
+    current_user: Users = Depends(get_current_user),
+):
+    """Reserve a room as a PENDING booking for BOOKING_HOLD_TTL_MINUTES while checkout completes"""
+    try:
+        async with unit_of_work(db):
+            room_amount = await stay_amount(db, booking.room_id, booking.check_in, booking.check_out)
+            if room_amount is None:
+                raise HTTPException(status_code=404, detail="Room not found")
+
+            hold_expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.BOOKING_HOLD_TTL_MINUTES)
+            hold_row = (await execute_query(
+                db,
+                insert(Bookings)
+                .values(
+                    **booking.model_dump(exclude={"booking_status", "user_id"}),
+                    user_id=current_user.id,
+                    booking_status=BookingStatusEnum.PENDING,
+                    total_amount=room_amount,
+                    hold_expires_at=hold_expires_at
+                )
+                .returning(*BOOKING_COLUMNS)
+            )).mappings().one()
+
+        booking_events.booking_held(booking.room_id, booking.check_in, booking.check_out)
+        return dict(hold_row)
+
+    except IntegrityError as e:
+        await rollback_db(db)
+        if is_overlap_violation(e):
+            raise HTTPException(status_code=409, detail="The requested room is not available for this date")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except SQLAlchemyError as e:
+        await rollback_db(db)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.post("/hold/confirm")
+async def confirm_held_room(
+    booking_id: int = Form(...),
+    addon_list: Optional[List[str]] = Form(None),
+    db: Session = Depends(get_async_db),
+    current_user: Users = Depends(get_current_user),
+):
+    """Turn a live hold into a CONFIRMED, paid booking"""
+    try:
+        async with unit_of_work(db):
+            addon_quantities = parse_addon_list(addon_list)
+            prices = await addon_prices(db, list(addon_quantities))
+
+            booking_row = await confirm_hold(db, booking_id, current_user.id)
+            if booking_row is None:
+                raise HTTPException(status_code=404, detail="No live hold with this booking id (not found, expired or already settled)")
+
+            booking_row["addons"] = [
+                {"addon_id": addon_id, "quantity": quantity, "base_price": prices[addon_id]}
+                for addon_id, quantity in addon_quantities.items()
+            ]
+            booking_row["payment"] = await insert_addons_and_payment(
+                db, booking_id, booking_row["total_amount"], addon_quantities, prices
+            )
+
+        return booking_row
+
+    except SQLAlchemyError as e:
+        await rollback_db(db)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.post("/hold/release")
+async def release_held_room(
+    booking_id: int = Form(...),
+    db: Session = Depends(get_async_db),
+    current_user: Users = Depends(get_current_user),
+):
+    """Give a held room back before its TTL runs out"""
+    try:
+        async with unit_of_work(db):
+            released = await release_hold(db, booking_id, current_user.id)
+            if released is None:
+                raise HTTPException(status_code=404, detail="No pending hold with this booking id")
+
+        booking_events.booking_released(released["room_id"], released["check_in"], released["check_out"])
+        return {"message": f"Hold on booking {booking_id} released"}
+
+    except SQLAlchemyError as e:
+        await rollback_db(db)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
 @router.post("/cancel")
 async def cancel_booking(
     booking_id: int = Form(...),
     reason: str = Form(...),
-    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=100),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user)
 ):
     try:
-        existing_booking = db.query(Bookings).filter(Bookings.id == booking_id).first()
-        if not existing_booking:
-            raise HTTPException(status_code=404, detail="Booking not found")
-
-        status = BookingStatusEnum(existing_booking.booking_status.lower())
-        if status != BookingStatusEnum.CONFIRMED:
-            raise HTTPException(status_code=400, detail="Only confirmed bookings can be cancelled")
-
-        existing_booking.booking_status = BookingStatusEnum.CANCELLED.value
-        total_Amount = existing_booking.total_amount
-
-        no_days = (existing_booking.check_in - date.today()).days
-        refund_amount = 0
-        message = ""
-        flag = 1
-
-        if no_days < 3:
-            flag = 0
-            message = "Cancellation request failed. Cancel before 3 days of check-in date"
-        elif 3 <= no_days <= 6:
-            refund_amount = total_Amount / 2
-            message = f"Refund amount {refund_amount} will be sent after 2 days"
-        elif no_days >= 7:
-            refund_amount = total_Amount
-            message = f"Refund amount {total_Amount} will be sent after 2 days"
-
-        payment = await get_record(db=db, model=Payments, booking_id=booking_id)
-        if not payment:
-            raise HTTPException(status_code=404, detail="Payment record not found")
-
-        payment.status = PaymentStatusEnum.REFUNDED.value
-
-        dicts = {
-            "payment_id": payment.id,
-            "status": RefundStatusEnum.APPROVED.value if flag else RefundStatusEnum.REJECTED.value,
-            "reason": message,
-            "total_amount": total_Amount,
-            "refund_amount": refund_amount
-        }
-
-        refunded_data = await insert_record(db=db, model=Refunds, **dicts)
-
-        status_history = BookingStatusHistoryBase(
-            booking_id=booking_id,
-            old_status=BookingStatusEnum.CONFIRMED.value,
-            new_status=BookingStatusEnum.CANCELLED.value
-        )
-
-        await insert_record(db=db, model=BookingStatusHistory, **status_history.model_dump())
-        await commit_db(db)
+        async with unit_of_work(db):
+            fingerprint = request_fingerprint("/booking/cancel", {"booking_id": booking_id, "reason": reason})
+            replay = await claim_idempotency_key(db, idempotency_key, current_user.id, "/booking/cancel", fingerprint)
+            if replay is not None:
+                return replay
+
+            existing_booking = await get_record_by_id(id=booking_id, model=Bookings, db=db)
+            if not existing_booking:
+                raise HTTPException(status_code=404, detail="Booking not found")
+
+            status = BookingStatusEnum(existing_booking.booking_status.lower())
+            if status != BookingStatusEnum.CONFIRMED:
+                raise HTTPException(status_code=400, detail="Only confirmed bookings can be cancelled")
+
+            existing_booking.booking_status = BookingStatusEnum.CANCELLED.value
+            total_Amount = existing_booking.total_amount
+
+            no_days = (existing_booking.check_in - date.today()).days
+            refund_amount = 0
+            message = ""
+            flag = 1
+
+            if no_days < 3:
+                flag = 0
+                message = "Cancellation request failed. Cancel before 3 days of check-in date"
+            elif 3 <= no_days <= 6:
+                refund_amount = total_Amount / 2
+                message = f"Refund amount {refund_amount} will be sent after 2 days"
+            elif no_days >= 7:
+                refund_amount = total_Amount
+                message = f"Refund amount {total_Amount} will be sent after 2 days"
+
+            payment = await get_record(db=db, model=Payments, booking_id=booking_id)
+            if not payment:
+                raise HTTPException(status_code=404, detail="Payment record not found")
+
+            payment.status = PaymentStatusEnum.REFUNDED.value
+
+            dicts = {
+                "payment_id": payment.id,
+                "status": RefundStatusEnum.APPROVED.value if flag else RefundStatusEnum.REJECTED.value,
+                "reason": message,
+                "total_amount": total_Amount,
+                "refund_amount": refund_amount
+            }
+
+            refunded_data = await insert_record(db=db, model=Refunds, **dicts)
+
+            status_history = BookingStatusHistoryBase(
+                booking_id=booking_id,
+                old_status=BookingStatusEnum.CONFIRMED.value,
+                new_status=BookingStatusEnum.CANCELLED.value
+            )
+
+            await insert_record(db=db, model=BookingStatusHistory, **status_history.model_dump())
+
+            if idempotency_key:
+                await refresh_db(db, refunded_data)
+                refunded_data = await save_idempotent_response(db, idempotency_key, current_user.id, refunded_data)
+
+        booking_events.booking_released(existing_booking.room_id, existing_booking.check_in, existing_booking.check_out)
 
         return refunded_data
 
     except SQLAlchemyError as e:
-        db.rollback()
+        await rollback_db(db)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await rollback_db(db)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
 @router.post("/checkAvailability")
 async def availabile_date_of_room(
     room_id: int = Form(...),
-    db: Session = Depends(get_db),
+    format: AvailabilityFormatEnum = Form(AvailabilityFormatEnum.DATES),
+    db: Session = Depends(get_read_db),
     current_user: Users = Depends(get_current_user)
 ):
     try:
-        available_dates = available_date_of_room(room_id=room_id, db=db, model=Bookings)
+        available_dates = available_date_of_room(room_id=room_id, db=db, model=Bookings, format=format)
         if not available_dates:
             raise HTTPException(status_code=404, detail="No availability data found")
         return available_dates
@@ -193,12 +331,50 @@ async def availabile_date_of_room(
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
+@router.get("/availability")
+async def availability_of_rooms(
+    room_ids: List[int] = Query(..., min_length=1, max_length=200),
+    format: AvailabilityFormatEnum = Query(AvailabilityFormatEnum.RUNS),
+    db: Session = Depends(get_read_db),
+    current_user: Users = Depends(get_current_user)
+):
+    """Next 90 days of availability for many rooms in one call, as dates, [start, end) runs or a base64 bitmap"""
+    try:
+        return available_dates_of_rooms(room_ids=list(dict.fromkeys(room_ids)), db=db, format=format)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/availableRooms")
+async def get_available_rooms(
+    check_in: date = Query(...),
+    check_out: date = Query(...),
+    no_of_adult: int = Query(1, ge=1),
+    no_of_child: int = Query(0, ge=0),
+    room_type_id: Optional[int] = Query(None),
+    floor_no: Optional[int] = Query(None),
+    min_price: Optional[int] = Query(None),
+    max_price: Optional[int] = Query(None),
+    after_id: Optional[int] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_async_read_db),
+    current_user: Users = Depends(get_current_user)
+):
+    return await available_rooms(
+        db=db, check_in=check_in, check_out=check_out,
+        no_of_adult=no_of_adult, no_of_child=no_of_child,
+        room_type_id=room_type_id, floor_no=floor_no,
+        min_price=min_price, max_price=max_price,
+        after_id=after_id, limit=limit
+    )
+
+
 @router.post("/reschedule")
 async def reschdule_bookings(
     booking_id: int = Form(...),
     check_in: date = Form(...),
     check_out: date = Form(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user)
 ):
     try:
@@ -216,46 +392,57 @@ async def reschdule_bookings(
         if date.today() > booking_instance.check_in - timedelta(days=cutoff_days):
             raise HTTPException(status_code=400, detail="Too late to reschedule this booking")
 
-        already_rescheduled = db.query(Reschedules).filter(Reschedules.booking_id == booking_id).first()
+        already_rescheduled = await get_record(db=db, model=Reschedules, booking_id=booking_id)
         if already_rescheduled:
             raise HTTPException(status_code=400, detail="This booking has already been rescheduled once")
 
-        available = check_availability(
-            db=db, model=Bookings, check_in=check_in, check_out=check_out, room_id=booking_instance.room_id
-        )
+        room_id = booking_instance.room_id
+        old_check_in, old_check_out = booking_instance.check_in, booking_instance.check_out
+        async with unit_of_work(db):
+            try:
+                # The exclusion constraint rejects new dates that overlap another booking of this room
+                booking_instance.check_in = check_in
+                booking_instance.check_out = check_out
+                await flush_db(db)
+            except IntegrityError as e:
+                await rollback_db(db)
+                if not is_overlap_violation(e):
+                    raise
+                room_instance = await get_record_by_id(db=db,model=Rooms,id = room_id)
+                room_type_instance = await get_record_by_id(db=db,model=RoomTypeWithSizes,id = room_instance.room_type_id)
+                return await available_rooms(db=db, check_in=check_in, check_out=check_out,no_of_adult = room_type_instance.no_of_adult,no_of_child=room_type_instance.no_of_child)
 
-        if available:
-            booking_instance.check_in = check_in
-            booking_instance.check_out = check_out
             reschedule_record = await insert_record(db=db, model=Reschedules, booking_id=booking_id)
-            await commit_db(db)
-            return reschedule_record
-        else:
-            room_instance = await get_record_by_id(db=db,model=Rooms,id = booking_instance.room_id)
-            room_type_instance = await get_record_by_id(db=db,model=RoomTypeWithSizes,id = room_instance.room_type_id)
-            return available_rooms(db=db, check_in=check_in, check_out=check_out,no_of_adult = room_type_instance.no_of_adult,no_of_child=room_type_instance.no_of_child)
+        booking_events.booking_moved(room_id, old_check_in, old_check_out, check_in, check_out)
+        return reschedule_record
 
     except SQLAlchemyError as e:
-        db.rollback()
+        await rollback_db(db)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await rollback_db(db)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 @router.get("/filter")
-async def whole_filter(
+async def filter_rooms(
     room_price : Optional[int] = Query(None),
     floor_no : Optional[int] = Query(None),
     room_type_name : Optional[str] = Query(None),
-    ratings : Optional[int] = Query(None),
+    ratings : Optional[int] = Query(None, ge=1, le=5),
     features : Optional[List[str]] = Query(None),
     bet_type_names : Optional[List[str]] = Query(None),
     check_in: Optional[date] = Query(None),
     check_out: Optional[date] = Query(None),
-    db: Session = Depends(get_db),
+    after_id: Optional[int] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    price_bucket: int = Query(1000, ge=1),
+    db: Session = Depends(get_async_read_db),
     current_user: Users = Depends(get_current_user)
 ): 
-    result = await whole_filter(db = db, room_price = room_price,floor_no=floor_no,room_type_name = room_type_name,ratings=ratings,features=features,bet_type_names=bet_type_names,check_in=check_in,check_out=check_out)
-    return result
+    try:
+        result = await whole_filter(db = db, room_price = room_price,floor_no=floor_no,room_type_name = room_type_name,ratings=ratings,features=features,bet_type_names=bet_type_names,check_in=check_in,check_out=check_out,after_id=after_id,limit=limit,price_bucket=price_bucket)
+        return result
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
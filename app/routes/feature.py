@@ -4,15 +4,16 @@ from sqlalchemy.orm import Session
 from app.schemas.features_schema import FeatureSchema
 from app.models.features import Features
 from app.models.user import Users
-from app.core.dependency import get_current_user, get_db
+from app.core.dependency import get_current_user, get_async_db
 from app.crud.generic_crud import (
     insert_record,
-    update_record,
-    delete_record,
+    update_record_returning,
+    delete_record_returning,
     save_image,
     get_record,
 )
 import os
+from app.services.room_type_index import room_type_index
 
 router = APIRouter(prefix="/feature", tags=["Features"])
 
@@ -22,7 +23,7 @@ router = APIRouter(prefix="/feature", tags=["Features"])
 async def add_feature(
     feature_name: str = Form(...),
     image: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     sub_static_dir = "feature_images"
@@ -37,6 +38,7 @@ async def add_feature(
         model=Features,
         **feature_data.model_dump(),
     )
+    await room_type_index.refresh_async()
 
     return new_feature
 
@@ -46,7 +48,7 @@ async def add_feature(
 async def update_feature_image(
     feature_id: int = Form(...),
     image: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     instance = await get_record(model=Features, db=db, id=feature_id)
@@ -65,7 +67,7 @@ async def update_feature_image(
         sub_static_dir = "feature_images"
         image_url = await save_image(image, sub_static_dir)
 
-        updated_feature = await update_record(
+        updated_feature = await update_record_returning(
             id=feature_id,
             model=Features,
             db=db,
@@ -80,14 +82,15 @@ async def update_feature_image(
 @router.delete("/delete")
 async def delete_feature(
     feature_id: int = Form(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
-    deleted_feature = await delete_record(
-        id=feature_id,
+    await delete_record_returning(
         model=Features,
         db=db,
+        id=feature_id,
     )
+    await room_type_index.refresh_async()
     return {"message": f"Feature with ID {feature_id} deleted successfully"}
 
 
@@ -95,7 +98,7 @@ async def delete_feature(
 @router.get("/get", response_model=FeatureSchema)
 async def get_feature(
     feature_name: str = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     feature = await get_record(model=Features, db=db, feature_name=feature_name)
@@ -4,8 +4,8 @@ from sqlalchemy.orm import Session
 from app.schemas.floor_schema import FloorBase
 from app.models.floor import Floors
 from app.models.user import Users
-from app.core.dependency import get_current_user, get_db
-from app.crud.generic_crud import insert_record, update_record, delete_record, get_record
+from app.core.dependency import get_current_user, get_async_db
+from app.crud.generic_crud import insert_record, delete_record_returning, get_record
 
 router = APIRouter(prefix="/floor", tags=["Floors"])
 
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/floor", tags=["Floors"])
 @router.post("/add", response_model=FloorBase)
 async def add_floor(
     floor_no: int = Form(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     floor_data = FloorBase(floorNo=floor_no)
@@ -31,25 +31,16 @@ async def add_floor(
 @router.delete("/delete", response_model=dict)
 async def delete_floor(
     floor_no: int = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
-    # Find the record first
-    record = await get_record(
+    # Rooms on the floor go with it through ON DELETE CASCADE
+    await delete_record_returning(
         db=db,
         model=Floors,
         floor_no=floor_no
     )
 
-    if not record:
-        raise HTTPException(status_code=404, detail=f"Floor {floor_no} not found")
-
-    await delete_record(
-        db=db,
-        model=Floors,
-        id=record.id
-    )
-
     return {"message": f"Floor {floor_no} deleted successfully"}
 
 
@@ -57,7 +48,7 @@ async def delete_floor(
 @router.get("/get", response_model=FloorBase)
 async def get_floor(
     floor_no: int = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     record = await get_record(
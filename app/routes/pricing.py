@@ -0,0 +1,153 @@
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Form
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.dependency import get_async_db, get_async_read_db, get_current_user, get_current_admin
+from app.crud.generic_crud import execute_query, commit_db, insert_record, delete_record_returning, get_records
+from app.crud.rooms import available_inventory_by_day
+from app.models.rate_plan import RatePlans, RateSeasons
+from app.models.room_type import RoomTypeWithSizes
+from app.models.user import Users
+from app.schemas.pricing_schema import QuoteRequest, RatePlanBase, RateSeasonBase
+from app.services.rate_engine import rate_engine
+from app.services.price_calendar import price_calendar_cache
+
+router = APIRouter(prefix="/pricing", tags=["Pricing"])
+
+
+# ------------------ QUOTE ------------------
+@router.post("/quote")
+async def quote_stays(
+    request: QuoteRequest,
+    db: Session = Depends(get_async_read_db),
+    current_user: Users = Depends(get_current_user),
+):
+    """Price many (room type, stay) combinations in one vectorized pass"""
+    items = request.items
+    quotes = rate_engine.quote(
+        [item.room_type_id for item in items],
+        [item.check_in for item in items],
+        [item.check_out for item in items]
+    )
+
+    # Outside the engine's window: fall back to base_price per night, fetched in one query
+    missing = {item.room_type_id for item, quote in zip(items, quotes) if quote is None}
+    base_prices = {}
+    if missing:
+        result = await execute_query(
+            db,
+            select(RoomTypeWithSizes.id, RoomTypeWithSizes.base_price).where(RoomTypeWithSizes.id.in_(missing))
+        )
+        base_prices = dict(result.all())
+
+    priced = []
+    for item, quote in zip(items, quotes):
+        entry = item.model_dump()
+        if quote is not None:
+            entry.update(quote, source="rate_engine")
+        elif item.room_type_id in base_prices:
+            nights = (item.check_out - item.check_in).days
+            subtotal = nights * base_prices[item.room_type_id]
+            entry.update(nights=nights, subtotal=subtotal, discount=0.0, total=subtotal, source="base_price")
+        else:
+            entry.update(error="Room type not found")
+        priced.append(entry)
+    return priced
+
+
+# ------------------ CALENDAR ------------------
+@router.get("/calendar")
+async def price_calendar(
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    no_of_adult: int = Query(1, ge=1),
+    no_of_child: int = Query(0, ge=0),
+    db: Session = Depends(get_async_read_db),
+    current_user: Users = Depends(get_current_user),
+):
+    """Cheapest available nightly price and free rooms for every remaining night of a month"""
+    today = date.today()
+    year = year or today.year
+    month = month or today.month
+
+    month_start = date(year, month, 1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1)
+    start = max(month_start, today)
+    if start >= month_end:
+        return {"year": year, "month": month, "days": []}
+
+    key = (year, month, no_of_adult, no_of_child, rate_engine.version)
+    days = price_calendar_cache.get(key)
+    if days is None:
+        rows = await available_inventory_by_day(db, start, month_end, no_of_adult, no_of_child)
+        rates = rate_engine.nightly_rates([row.room_type_id for row in rows], [row.day for row in rows])
+
+        by_day = {start + timedelta(days=offset): {"free_rooms": 0, "min_price": None} for offset in range((month_end - start).days)}
+        for row, rate in zip(rows, rates):
+            entry = by_day[row.day]
+            price = round(rate) if rate is not None else row.base_price
+            entry["free_rooms"] += row.free_rooms
+            if entry["min_price"] is None or price < entry["min_price"]:
+                entry["min_price"] = price
+
+        days = [{"date": day, **entry} for day, entry in sorted(by_day.items())]
+        price_calendar_cache.put(key, days)
+
+    return {"year": year, "month": month, "days": days}
+
+
+# ------------------ RATE PLANS ------------------
+@router.post("/plan")
+async def upsert_rate_plan(
+    plan: RatePlanBase,
+    db: Session = Depends(get_async_db),
+    current_user: Users = Depends(get_current_admin),
+):
+    values = plan.model_dump()
+    values["los_discounts"] = {str(nights): discount for nights, discount in plan.los_discounts.items()}
+    statement = insert(RatePlans).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[RatePlans.room_type_id],
+        set_={name: statement.excluded[name] for name in ("weekend_multiplier", "weekend_days", "los_discounts")}
+    ).returning(RatePlans.id, RatePlans.room_type_id, RatePlans.weekend_multiplier, RatePlans.weekend_days, RatePlans.los_discounts)
+
+    row = (await execute_query(db, statement)).mappings().one()
+    await commit_db(db)
+    await rate_engine.refresh_async()
+    return dict(row)
+
+
+@router.get("/plan")
+async def get_rate_plan(
+    room_type_id: int = Query(...),
+    db: Session = Depends(get_async_read_db),
+    current_user: Users = Depends(get_current_user),
+):
+    plans = await get_records(model=RatePlans, db=db, room_type_id=room_type_id)
+    seasons = await get_records(model=RateSeasons, db=db, room_type_id=room_type_id)
+    return {"plan": plans[0] if plans else None, "seasons": seasons}
+
+
+# ------------------ SEASONS ------------------
+@router.post("/season")
+async def add_rate_season(
+    season: RateSeasonBase,
+    db: Session = Depends(get_async_db),
+    current_user: Users = Depends(get_current_admin),
+):
+    new_season = await insert_record(db=db, model=RateSeasons, **season.model_dump())
+    await rate_engine.refresh_async()
+    return new_season
+
+
+@router.delete("/season")
+async def delete_rate_season(
+    season_id: int = Form(...),
+    db: Session = Depends(get_async_db),
+    current_user: Users = Depends(get_current_admin),
+):
+    await delete_record_returning(model=RateSeasons, db=db, id=season_id)
+    await rate_engine.refresh_async()
+    return {"message": f"Season with ID {season_id} deleted successfully"}
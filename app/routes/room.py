@@ -1,16 +1,17 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Form
-from sqlalchemy import String, Text, func, text
+from sqlalchemy import String, Text, func, select, text
 from sqlalchemy.orm import Session
 from datetime import datetime
-from app.models.Enum import RoomStatusEnum
+from app.models.Enum import RoomStatusEnum, SearchModeEnum
 from app.models.rooms import Rooms
 from app.models.user import Users
 from app.models.room_status_history import RoomStatusHistory
 from app.schemas.rooms_schema import RoomsBase
-from app.core.dependency import get_db, get_current_user
-from app.crud.generic_crud import insert_record,update_record,get_record,get_record_by_id,delete_record,filter_record,search
+from app.core.dependency import get_async_db, get_async_read_db, get_read_db, get_current_user
+from app.crud.generic_crud import insert_record,update_record_returning,get_record,delete_record_returning,filter_record,search,execute_query
 from app.schemas.status_history_schema import RoomStatusHistoryBase
+from app.services.availability_index import availability_index
 router = APIRouter(prefix="/room", tags=["Rooms"])
 
 
@@ -19,7 +20,7 @@ async def add_room(
     room_type_id: int = Form(...),
     floor_id: int = Form(...),
     room_no: int = Form(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     """Add a new room record"""
@@ -30,6 +31,7 @@ async def add_room(
         status=RoomStatusEnum("available"),
     )
     room_data = await insert_record(db=db, model=Rooms, **room_base.model_dump())
+    availability_index.add_room(room_data.id)
     return room_data
 
 
@@ -40,17 +42,16 @@ async def update_room(
     floor_id: Optional[int] = Form(None),
     room_no: Optional[int] = Form(None),
     status: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     """Update room details"""
-    # Step 1: Fetch existing room
-    existing_room = await get_record_by_id(model = Rooms,db = db,id = room_id)
+    # Step 1: Fetch the current status only
+    old_status = (await execute_query(db, select(Rooms.status).where(Rooms.id == room_id))).scalar()
     update_data = {}
-    if not existing_room:
+    if old_status is None:
         raise HTTPException(status_code=404, detail="Room not found")
     
-    old_status = existing_room.status
     if status != "string":
         try:
             # Convert to lowercase and validate against the Enum
@@ -60,11 +61,11 @@ async def update_room(
             raise HTTPException(status_code=400, detail=f"Invalid room status: {status}")
         update_data["status"] = new_status
     else:
-        new_status = existing_room.status
+        new_status = old_status
         
     if status and new_status != old_status:
         history_entry = RoomStatusHistoryBase(
-            room_id=id,
+            room_id=room_id,
             old_status=old_status,
             new_status=new_status
         )
@@ -79,7 +80,7 @@ async def update_room(
     
     # Step 4: Update the room record
     
-    room_data = await update_record(id=id,db=db, model=Rooms,**update_data)
+    room_data = await update_record_returning(id=room_id,db=db, model=Rooms,**update_data)
   
     return room_data
 
@@ -87,12 +88,12 @@ async def update_room(
 @router.delete("/delete")
 async def delete_room(
     room_id: int = Form(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     current_user: Users = Depends(get_current_user),
 ):
     
-    deleted_data = await delete_record(db=db, model=Rooms, id=room_id)
-    return deleted_data
+    deleted_ids = await delete_record_returning(db=db, model=Rooms, id=room_id)
+    return {"deleted_ids": deleted_ids}
 
 
 @router.get("/get")
@@ -100,7 +101,7 @@ async def get_room(
     room_no: Optional[int] = Query(None),
     floor_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_read_db),
     current_user: Users = Depends(get_current_user)
 ):
     """Fetch room records by filters"""
@@ -112,7 +113,7 @@ async def get_room(
     if status is not None:
         filters["status"] = status
 
-    return await get_record(db=db, model=Rooms, **filters)
+    return await get_record(db=db, model=Rooms, profile="detail", **filters)
 
 @router.get("/filter")
 async def filter_room(
@@ -120,7 +121,7 @@ async def filter_room(
     status : Optional[str] = Query(None),
     created_from : Optional[datetime] = Query(None),
     created_to : Optional[datetime] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_read_db),
     current_user: Users = Depends(get_current_user)
 ):
     valid_values = [e.value for e in RoomStatusEnum]
@@ -138,7 +139,7 @@ async def filter_room(
     if created_to:
         dicts["created_at"] = ["<=",created_to]
         
-    result = await filter_record(db=db,model= Rooms,**dicts)
+    result = await filter_record(db=db,model= Rooms,profile="list",**dicts)
     return result
 
 
@@ -148,10 +149,11 @@ def search_rooms(
     q: str = Query(..., min_length=1),
     page: int = 1,
     per_page: int = 10, 
-    db: Session = Depends(get_db),
+    mode: Optional[SearchModeEnum] = Query(None),
+    db: Session = Depends(get_read_db),
     current_user: Users = Depends(get_current_user)
 ):
 
-    result = search(db=db, model=Rooms, q=q, page=page, per_page=per_page)
+    result = search(db=db, model=Rooms, q=q, page=page, per_page=per_page, mode=mode)
     return result
 
@@ -10,7 +10,9 @@ from app.models.features import Features
 from app.models.roomType_bedType import RoomTypeBedTypes
 from app.schemas.room_type_schema import  RoomTypeResponse
 from app.models.associations import room_type_features
-from app.crud.generic_crud import insert_record, delete_record, get_record, save_images,get_record_by_id,update_record,commit_db
+from app.crud.generic_crud import insert_record, delete_record, get_record, save_images,get_record_by_id,update_record,unit_of_work
+from app.services.room_type_index import room_type_index
+from app.services.rate_engine import rate_engine
 
 router = APIRouter(prefix="/roomtype", tags=["Room Types"])
 
@@ -40,51 +42,53 @@ async def add_room_type(
         no_of_child = no_of_child,
         )
     
-    data = await insert_record(
-        model=RoomTypeWithSizes,
-        db=db,
-        **room_type_data.model_dump(),
-        images = image_urls
-    )
+    async with unit_of_work(db):
+        data = await insert_record(
+            model=RoomTypeWithSizes,
+            db=db,
+            **room_type_data.model_dump(),
+            images = image_urls
+        )
     
-    if bed_type_id_with_count:
-        room_type_bed_type = []
-        for btwc in bed_type_id_with_count:
+        if bed_type_id_with_count:
+            room_type_bed_type = []
+            for btwc in bed_type_id_with_count:
             
-            dicts = {}
-            bed_type_id, count = btwc.split(":")
+                dicts = {}
+                bed_type_id, count = btwc.split(":")
             
-            count = int(count)
+                count = int(count)
             
-            bed_type_instance = await get_record(db = db,model = BedTypes,id = int(bed_type_id))
+                bed_type_instance = await get_record(db = db,model = BedTypes,id = int(bed_type_id))
             
-            if not bed_type_instance:
-                raise HTTPException(status_code=404, detail="Bed type not found")
+                if not bed_type_instance:
+                    raise HTTPException(status_code=404, detail="Bed type not found")
             
-            dicts["bed_type_id"] = bed_type_instance.id
-            dicts["num_of_beds"] = count
-            dicts["room_type_id"] = data.id
+                dicts["bed_type_id"] = bed_type_instance.id
+                dicts["num_of_beds"] = count
+                dicts["room_type_id"] = data.id
             
-            room_type_bed_type.append(dicts)
+                room_type_bed_type.append(dicts)
         
-    if feature_ids:  
-        feature_ids = feature_ids[0].split(',')
+        if feature_ids:  
+            feature_ids = feature_ids[0].split(',')
         
-        for feature_id in feature_ids:
-            print(feature_id)
-            feature_instance = await get_record(db = db,model = Features,id = int(feature_id))
+            for feature_id in feature_ids:
+                feature_instance = await get_record(db = db,model = Features,id = int(feature_id))
             
-            if not feature_instance:
-                raise HTTPException(status_code=404, detail="Feature not found.")
+                if not feature_instance:
+                    raise HTTPException(status_code=404, detail="Feature not found.")
 
-            db.execute(room_type_features.insert().values(room_type_id = data.id,feature_id = feature_instance.id))
+                db.execute(room_type_features.insert().values(room_type_id = data.id,feature_id = feature_instance.id))
         
    
         
-    for item in room_type_bed_type:
-        await insert_record(db=db, model=RoomTypeBedTypes, **item)
+        for item in room_type_bed_type:
+            await insert_record(db=db, model=RoomTypeBedTypes, **item)
         
-    commit_db(db=db)  
+
+    await room_type_index.refresh_async()
+    await rate_engine.refresh_async()
     return data
 
 @router.post("/update")
@@ -175,5 +179,7 @@ async def update_room_type(
 
     # Refresh and return updated record
     db.refresh(room_type)
+    await room_type_index.refresh_async()
+    await rate_engine.refresh_async()
     return room_type
 
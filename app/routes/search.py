@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from app.core.dependency import get_async_db, get_current_user, is_admin, jwt_bearer, read_session_factory
+from app.crud.generic_crud import ranked_search, returning_columns
+from app.models.addon import Addons
+from app.models.bed_type import BedTypes
+from app.models.bookings import Bookings
+from app.models.features import Features
+from app.models.floor import Floors
+from app.models.room_type import RoomTypeWithSizes
+from app.models.rooms import Rooms
+from app.models.user import Users
+from app.services.suggest_index import suggest_index
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+router = APIRouter(tags=["Search"])
+
+# Every table maintained by app/alter_scripts.py with search_vector / search_text
+SEARCH_MODELS = {
+    "rooms": Rooms,
+    "room_types": RoomTypeWithSizes,
+    "floors": Floors,
+    "features": Features,
+    "addons": Addons,
+    "bed_types": BedTypes,
+    "bookings": Bookings,
+    "users": Users,
+}
+ADMIN_ONLY = {"users"}
+HIDDEN_FIELDS = {"password"}
+ENABLED_TYPES = [name.strip() for name in settings.SEARCH_ENTITIES.split(",") if name.strip() in SEARCH_MODELS]
+
+# Fan-out connections across all requests; always below the pool's capacity so
+# /search can neither wait out POSTGRES_POOL_TIMEOUT nor starve other endpoints
+SEARCH_SLOTS = threading.BoundedSemaphore(
+    max(1, min(settings.SEARCH_MAX_CONCURRENCY, settings.POSTGRES_POOL_SIZE + settings.POSTGRES_MAX_OVERFLOW - 1))
+)
+
+
+def search_entity(entity_type: str, q: str, limit: int, owner_id: Optional[int], deadline: float):
+    """
+    One entity type on its own pooled connection; None when no connection slot
+    frees up before the deadline. statement_timeout ends the query at the
+    deadline, so an abandoned worker never outlives it by much.
+    """
+    if not SEARCH_SLOTS.acquire(timeout=max(0.0, deadline - time.monotonic())):
+        return None
+    try:
+        remaining_ms = int((deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            return None
+        return run_entity_search(entity_type, q, limit, owner_id, remaining_ms)
+    finally:
+        SEARCH_SLOTS.release()
+
+
+def run_entity_search(entity_type: str, q: str, limit: int, owner_id: Optional[int], timeout_ms: int):
+    model = SEARCH_MODELS[entity_type]
+    filters = [Bookings.user_id == owner_id] if entity_type == "bookings" and owner_id is not None else []
+    columns = [column.key for column in returning_columns(model) if column.key not in HIDDEN_FIELDS]
+
+    db = read_session_factory()()
+    try:
+        db.execute(text("SELECT set_config('statement_timeout', :timeout, true)"), {"timeout": str(timeout_ms)})
+        rows = ranked_search(db, model, q, limit=limit, profile="auth", filters=filters)
+        return [
+            {
+                "type": entity_type,
+                "id": instance.id,
+                "score": round(float(score), 4),
+                "item": {key: getattr(instance, key) for key in columns}
+            }
+            for instance, score in rows
+        ]
+    finally:
+        db.close()
+
+
+@router.get("/search")
+async def search_everything(
+    q: str = Query(..., min_length=1),
+    types: Optional[List[str]] = Query(None),
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_async_db),
+    current_user: Users = Depends(get_current_user)
+):
+    """Hybrid search over every enabled entity type at once, merged by normalised score"""
+    admin = await is_admin(current_user, db)
+    allowed = [name for name in ENABLED_TYPES if admin or name not in ADMIN_ONLY]
+
+    if types:
+        unknown = [name for name in types if name not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unsupported search types: {unknown}")
+        allowed = [name for name in allowed if name in types]
+
+    # Non-admins only ever see their own bookings
+    owner_id = None if admin else current_user.id
+    deadline = time.monotonic() + settings.SEARCH_DEADLINE_MS / 1000
+    tasks = {
+        asyncio.ensure_future(run_in_threadpool(search_entity, name, q, limit, owner_id, deadline)): name
+        for name in allowed
+    }
+    if not tasks:
+        return {"query": q, "results": [], "timed_out": [], "failed": []}
+
+    done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.monotonic()))
+
+    # The worker threads cannot be interrupted; statement_timeout ends their queries
+    for task in pending:
+        task.cancel()
+
+    results, failed = [], []
+    timed_out = [tasks[task] for task in pending]
+    for task in done:
+        if task.exception() is not None:
+            logger.warning("search %s failed: %s", tasks[task], task.exception())
+            failed.append(tasks[task])
+        elif task.result() is None:
+            timed_out.append(tasks[task])
+        else:
+            results.extend(task.result())
+
+    results.sort(key=lambda hit: hit["score"], reverse=True)
+    return {
+        "query": q,
+        "results": results,
+        "timed_out": sorted(timed_out),
+        "failed": sorted(failed)
+    }
+
+
+@router.get("/search/suggest")
+async def suggest(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(8, ge=1, le=50),
+    user_id: int = Depends(jwt_bearer)
+):
+    """Typeahead completions of the last word typed, most popular first - token check only, no database round trip"""
+    suggestions = suggest_index.suggest(q, limit)
+    if suggestions is None:
+        # Not built yet: the sync task builds it, never the request
+        suggest_index.mark_dirty(None)
+        suggestions = []
+    return {"query": q, "suggestions": suggestions}
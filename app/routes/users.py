@@ -4,7 +4,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.schemas.user_schema import UserBase, UserForgetPassword,UserResponse
-from app.core.dependency import get_db
+from app.core.dependency import get_db, get_read_db
 from app.crud import user
 from app.auth.jwt_handler import verify_refresh_token
 from app.core.dependency import get_current_user
@@ -126,7 +126,7 @@ def refresh_token(
 
 @router.get("/users")
 def get_all_users(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Users = Depends(get_current_user)
 ):
     """Get all users - Protected endpoint (requires cookie or header token)"""
@@ -1,6 +1,7 @@
 from datetime import date
+from typing import List, Optional
 from pydantic import BaseModel, Field, field_validator
-from app.models.Enum import BookingStatusEnum
+from app.models.Enum import BookingStatusEnum, GroupBookingPolicyEnum
 
 class BookingBase(BaseModel):
     user_id: int = Field(..., gt=0, description="Foreign key to User table")
@@ -20,3 +21,23 @@ class BookingBase(BaseModel):
         if check_in and v <= check_in:
             raise ValueError("check_out date must be after check_in date")
         return v
+
+
+class GroupBookingItem(BaseModel):
+    room_id: int = Field(..., gt=0, description="Foreign key to Room table")
+    check_in: date = Field(..., description="Check-in date")
+    check_out: date = Field(..., description="Check-out date (must be after check-in)")
+    addon_list: Optional[List[str]] = Field(default=None, description="Addons as 'addon_id:quantity'")
+
+    @field_validator("check_out")
+    @classmethod
+    def validate_dates(cls, v, values):
+        check_in = values.data.get("check_in")
+        if check_in and v <= check_in:
+            raise ValueError("check_out date must be after check_in date")
+        return v
+
+
+class GroupBookingRequest(BaseModel):
+    rooms: List[GroupBookingItem] = Field(..., min_length=1, max_length=50)
+    policy: GroupBookingPolicyEnum = Field(default=GroupBookingPolicyEnum.ALL_OR_NOTHING)
@@ -0,0 +1,59 @@
+from datetime import date
+from typing import Dict, List
+from pydantic import BaseModel, Field, field_validator
+
+
+class QuoteItem(BaseModel):
+    room_type_id: int = Field(..., gt=0)
+    check_in: date = Field(..., description="Check-in date")
+    check_out: date = Field(..., description="Check-out date (must be after check-in)")
+
+    @field_validator("check_out")
+    @classmethod
+    def validate_dates(cls, v, values):
+        check_in = values.data.get("check_in")
+        if check_in and v <= check_in:
+            raise ValueError("check_out date must be after check_in date")
+        return v
+
+
+class QuoteRequest(BaseModel):
+    items: List[QuoteItem] = Field(..., min_length=1, max_length=500)
+
+
+class RatePlanBase(BaseModel):
+    room_type_id: int = Field(..., gt=0)
+    weekend_multiplier: float = Field(1.0, gt=0, le=10)
+    weekend_days: List[int] = Field(default_factory=lambda: [4, 5], description="Weekday numbers, Monday = 0")
+    los_discounts: Dict[int, float] = Field(default_factory=dict, description="Minimum nights -> fraction off")
+
+    @field_validator("weekend_days")
+    @classmethod
+    def validate_weekend_days(cls, v):
+        if any(day < 0 or day > 6 for day in v):
+            raise ValueError("weekend_days must be between 0 (Monday) and 6 (Sunday)")
+        return sorted(set(v))
+
+    @field_validator("los_discounts")
+    @classmethod
+    def validate_los_discounts(cls, v):
+        for nights, discount in v.items():
+            if nights < 1 or not 0 <= discount < 1:
+                raise ValueError("los_discounts needs nights >= 1 and a discount in [0, 1)")
+        return v
+
+
+class RateSeasonBase(BaseModel):
+    room_type_id: int = Field(..., gt=0)
+    season_name: str = Field(..., min_length=2, max_length=100)
+    start_date: date
+    end_date: date
+    nightly_rate: int = Field(..., gt=0, le=1000000)
+
+    @field_validator("end_date")
+    @classmethod
+    def validate_dates(cls, v, values):
+        start_date = values.data.get("start_date")
+        if start_date and v <= start_date:
+            raise ValueError("end_date must be after start_date")
+        return v
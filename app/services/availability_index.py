@@ -0,0 +1,236 @@
+# app/services/availability_index.py
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Optional
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.database_postgres import SessionLocal
+from app.models.bookings import Bookings, OCCUPYING_STATUSES
+from app.models.rooms import Rooms
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bookings made by other workers (or scripts) mark this index stale through the table listener
+AVAILABILITY_INDEX_TABLES = {"bookings"}
+# How far before the last sync apply_changes looks for changed bookings
+CHANGE_MARGIN = timedelta(minutes=5)
+
+
+class AvailabilityIndex:
+    """
+    Per-process room occupancy bitmap.
+
+    One row per room, one column per day starting at `epoch` (the build
+    date). A True cell means the room is held by an occupying booking that
+    night. Queries return None whenever the index cannot answer (not built
+    yet, built on an earlier day, unknown room, window past the horizon) so
+    callers fall back to SQL.
+
+    Marks made while the database is being read (a build, or a sync of
+    changed rooms) are kept and replayed onto the result before it is
+    installed, so a booking that commits meanwhile is never lost.
+
+    A bookings notification does not rebuild: sync() recomputes only the
+    rooms whose bookings changed since the last build or sync, found
+    through bookings.updated_at. Deleted bookings leave no such trace and
+    wait for the periodic full refresh.
+    """
+
+    def __init__(self, horizon_days: int):
+        self.horizon_days = horizon_days
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._stale = threading.Event()
+        self._needs_rebuild = threading.Event()
+        self._epoch: Optional[date] = None
+        self._synced_at: Optional[datetime] = None
+        self._rows: dict = {}
+        self._occupancy = np.zeros((0, horizon_days), dtype=bool)
+        self._recording = False
+        self._pending_marks: list = []
+
+    # --------------------- BUILD ---------------------
+    def build(self, db: Session):
+        with self._build_lock, self._recording_marks():
+            self._build(db)
+
+    def _build(self, db: Session):
+        epoch = date.today()
+        horizon_end = epoch + timedelta(days=self.horizon_days)
+        synced_at = db.execute(select(func.now())).scalar()
+
+        room_ids = [room_id for (room_id,) in db.query(Rooms.id).order_by(Rooms.id)]
+        bookings = db.query(Bookings.room_id, Bookings.check_in, Bookings.check_out).filter(
+            Bookings.booking_status.in_(OCCUPYING_STATUSES),
+            Bookings.check_out > epoch,
+            Bookings.check_in < horizon_end
+        ).all()
+
+        rows = {room_id: row for row, room_id in enumerate(room_ids)}
+        occupancy = self._occupancy_of(epoch, rows, bookings)
+
+        with self._lock:
+            occupancy = self._replay_marks(epoch, rows, occupancy)
+            self._epoch = epoch
+            self._synced_at = synced_at
+            self._rows = rows
+            self._occupancy = occupancy
+
+        logger.info("Availability index built: %d rooms, %d bookings", len(room_ids), len(bookings))
+
+    def refresh(self):
+        db = SessionLocal()
+        try:
+            self.build(db)
+        finally:
+            db.close()
+
+    # --------------------- CHANGE NOTIFICATIONS ---------------------
+    def mark_stale(self, table: Optional[str]):
+        """Table listener callback; None (listener reconnected) may hide missed changes, so rebuild"""
+        if table is None:
+            self._needs_rebuild.set()
+        self._stale.set()
+
+    def sync(self):
+        """Recompute the rooms whose bookings changed, or rebuild after a reconnect or a new day"""
+        if not self._stale.is_set():
+            return
+        self._stale.clear()
+        rebuild = self._needs_rebuild.is_set()
+        self._needs_rebuild.clear()
+        try:
+            db = SessionLocal()
+            try:
+                if rebuild or self._epoch != date.today():
+                    self.build(db)
+                else:
+                    self.apply_changes(db)
+            finally:
+                db.close()
+        except Exception:
+            if rebuild:
+                self._needs_rebuild.set()
+            self._stale.set()
+            raise
+
+    def apply_changes(self, db: Session):
+        with self._build_lock, self._recording_marks():
+            with self._lock:
+                epoch, since = self._epoch, self._synced_at
+            if epoch is None:
+                return
+            horizon_end = epoch + timedelta(days=self.horizon_days)
+            synced_at = db.execute(select(func.now())).scalar()
+
+            # updated_at is the writer's transaction start; the margin covers transactions still open at the last sync
+            room_ids = sorted({
+                room_id for (room_id,) in db.query(Bookings.room_id).filter(
+                    Bookings.updated_at > since - CHANGE_MARGIN
+                ).distinct()
+            })
+            bookings = db.query(Bookings.room_id, Bookings.check_in, Bookings.check_out).filter(
+                Bookings.room_id.in_(room_ids),
+                Bookings.booking_status.in_(OCCUPYING_STATUSES),
+                Bookings.check_out > epoch,
+                Bookings.check_in < horizon_end
+            ).all() if room_ids else []
+
+            changed = {room_id: row for row, room_id in enumerate(room_ids)}
+            changed_occupancy = self._occupancy_of(epoch, changed, bookings)
+
+            with self._lock:
+                for room_id, row in changed.items():
+                    if room_id not in self._rows:
+                        self.add_room(room_id)
+                    self._occupancy[self._rows[room_id]] = changed_occupancy[row]
+                self._occupancy = self._replay_marks(epoch, self._rows, self._occupancy)
+                self._synced_at = synced_at
+
+        logger.info("Availability index synced: %d rooms changed", len(room_ids))
+
+    # --------------------- INCREMENTAL UPDATES ---------------------
+    def add_room(self, room_id: int):
+        with self._lock:
+            if self._epoch is None or room_id in self._rows:
+                return
+            self._rows[room_id] = self._occupancy.shape[0]
+            self._occupancy = np.vstack([self._occupancy, np.zeros((1, self.horizon_days), dtype=bool)])
+
+    def mark(self, room_id: int, check_in: date, check_out: date, occupied: bool):
+        with self._lock:
+            if self._recording:
+                self._pending_marks.append((room_id, check_in, check_out, occupied))
+            if self._epoch is None:
+                return
+            if room_id not in self._rows:
+                self.add_room(room_id)
+            start, end = self._span(self._epoch, check_in, check_out)
+            if start < end:
+                self._occupancy[self._rows[room_id], start:end] = occupied
+
+    # --------------------- QUERIES ---------------------
+    def free_days(self, room_id: int, start: date, end: date) -> Optional[np.ndarray]:
+        """Boolean mask of free nights in [start, end) for one room"""
+        with self._lock:
+            window = self._window(start, end)
+            row = self._rows.get(room_id)
+            if window is None or row is None:
+                return None
+            return ~self._occupancy[row, window[0]:window[1]]
+
+    # --------------------- HELPERS ---------------------
+    @contextmanager
+    def _recording_marks(self):
+        with self._lock:
+            self._recording = True
+            self._pending_marks = []
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._recording = False
+                self._pending_marks = []
+
+    def _replay_marks(self, epoch: date, rows: dict, occupancy: np.ndarray) -> np.ndarray:
+        """Apply the marks recorded since the database was read; `rows` gains any new room"""
+        for room_id, check_in, check_out, occupied in self._pending_marks:
+            if room_id not in rows:
+                rows[room_id] = occupancy.shape[0]
+                occupancy = np.vstack([occupancy, np.zeros((1, self.horizon_days), dtype=bool)])
+            start, end = self._span(epoch, check_in, check_out)
+            if start < end:
+                occupancy[rows[room_id], start:end] = occupied
+        return occupancy
+
+    def _occupancy_of(self, epoch: date, rows: dict, bookings) -> np.ndarray:
+        booked = [(rows[b.room_id], *self._span(epoch, b.check_in, b.check_out)) for b in bookings if b.room_id in rows]
+
+        # +1 at each start, -1 at each end, running sum > 0 marks occupied nights
+        delta = np.zeros((len(rows), self.horizon_days + 1), dtype=np.int32)
+        if booked:
+            booked_rows, starts, ends = (np.array(col) for col in zip(*booked))
+            np.add.at(delta, (booked_rows, starts), 1)
+            np.add.at(delta, (booked_rows, ends), -1)
+        return np.cumsum(delta, axis=1)[:, :self.horizon_days] > 0
+
+    def _span(self, epoch: date, check_in: date, check_out: date):
+        start = min(max((check_in - epoch).days, 0), self.horizon_days)
+        end = min(max((check_out - epoch).days, 0), self.horizon_days)
+        return start, end
+
+    def _window(self, start: date, end: date):
+        if self._epoch is None or self._epoch != date.today():
+            return None
+        offset, stop = (start - self._epoch).days, (end - self._epoch).days
+        if offset < 0 or stop > self.horizon_days or offset > stop:
+            return None
+        return offset, stop
+
+
+availability_index = AvailabilityIndex(horizon_days=settings.AVAILABILITY_INDEX_HORIZON_DAYS)
@@ -0,0 +1,27 @@
+# app/services/booking_events.py
+from datetime import date
+from app.services.availability_index import availability_index
+from app.services.price_calendar import price_calendar_cache
+
+# Called by the booking routes after a commit that changes which nights a
+# room is held, so every in-process cache stays in step with Bookings.
+
+
+def booking_confirmed(room_id: int, check_in: date, check_out: date):
+    availability_index.mark(room_id, check_in, check_out, occupied=True)
+    price_calendar_cache.invalidate_range(check_in, check_out)
+
+
+def booking_held(room_id: int, check_in: date, check_out: date):
+    # A PENDING hold occupies the room exactly like a confirmed booking
+    booking_confirmed(room_id, check_in, check_out)
+
+
+def booking_released(room_id: int, check_in: date, check_out: date):
+    availability_index.mark(room_id, check_in, check_out, occupied=False)
+    price_calendar_cache.invalidate_range(check_in, check_out)
+
+
+def booking_moved(room_id: int, old_check_in: date, old_check_out: date, check_in: date, check_out: date):
+    booking_released(room_id, old_check_in, old_check_out)
+    booking_confirmed(room_id, check_in, check_out)
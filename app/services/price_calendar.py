@@ -0,0 +1,64 @@
+# app/services/price_calendar.py
+import threading
+import time
+from datetime import date, timedelta
+from typing import Optional
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Inventory and prices behind every cached month; other workers' changes arrive through the table listener
+PRICE_CALENDAR_TABLES = {"bookings", "rooms", "rate_plans", "rate_seasons"}
+
+
+class PriceCalendarCache:
+    """
+    Per-process cache of /pricing/calendar months.
+
+    Entries are keyed by (year, month, adults, children, rate engine version),
+    so a rate rebuild retires them implicitly. This worker's booking changes
+    drop the months a stay touches; a change notified by another worker
+    drops everything. The TTL bounds staleness if notifications are lost.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: dict = {}
+
+    def get(self, key: tuple) -> Optional[list]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, days = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            return days
+
+    def put(self, key: tuple, days: list):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), days)
+
+    def invalidate_range(self, check_in: date, check_out: date):
+        """Drop every cached month containing a night of [check_in, check_out)"""
+        months = set()
+        day = date(check_in.year, check_in.month, 1)
+        while day < check_out:
+            months.add((day.year, day.month))
+            day = (day + timedelta(days=32)).replace(day=1)
+        with self._lock:
+            for key in [key for key in self._entries if key[:2] in months]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, table: Optional[str]):
+        """Table listener callback: the notification doesn't say which nights changed"""
+        self.clear()
+
+
+price_calendar_cache = PriceCalendarCache(ttl_seconds=settings.PRICE_CALENDAR_CACHE_SECONDS)
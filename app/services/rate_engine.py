@@ -0,0 +1,188 @@
+# app/services/rate_engine.py
+import logging
+import threading
+from datetime import date, timedelta
+from typing import List, Optional, Sequence
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from app.core.database_postgres import SessionLocal
+from app.models.rate_plan import RatePlans, RateSeasons
+from app.models.room_type import RoomTypeWithSizes
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Length-of-stay discounts are looked up by nights, capped here
+MAX_LOS_NIGHTS = 60
+
+
+class RateEngine:
+    """
+    Per-process nightly rate table.
+
+    `_cumulative[row, d]` is the price of nights [epoch, epoch + d) for a room
+    type, built from base_price, season overrides and weekend multipliers, so
+    any stay costs two lookups and a subtraction. `_los[row, nights]` holds the
+    length-of-stay discount. Quotes return None when the engine cannot answer
+    (not built, built on an earlier day, unknown room type, outside horizon).
+    """
+
+    def __init__(self, horizon_days: int):
+        self.horizon_days = horizon_days
+        self._lock = threading.Lock()
+        self._epoch: Optional[date] = None
+        # Bumped on every build so caches of derived prices can key on it
+        self.version = 0
+        self._stale = threading.Event()
+        self._rows: dict = {}
+        self._cumulative = np.zeros((0, horizon_days + 1))
+        self._los = np.zeros((0, MAX_LOS_NIGHTS + 1))
+
+    # --------------------- BUILD ---------------------
+    def build(self, db: Session):
+        epoch = date.today()
+        horizon_end = epoch + timedelta(days=self.horizon_days)
+
+        room_types = db.execute(select(RoomTypeWithSizes.id, RoomTypeWithSizes.base_price).order_by(RoomTypeWithSizes.id)).all()
+        plans = db.execute(select(
+            RatePlans.room_type_id, RatePlans.weekend_multiplier, RatePlans.weekend_days, RatePlans.los_discounts
+        )).all()
+        seasons = db.execute(
+            select(RateSeasons.room_type_id, RateSeasons.start_date, RateSeasons.end_date, RateSeasons.nightly_rate)
+            .where(RateSeasons.end_date > epoch, RateSeasons.start_date < horizon_end)
+            .order_by(RateSeasons.start_date)
+        ).all()
+
+        rows = {room_type_id: row for row, (room_type_id, _) in enumerate(room_types)}
+        base_prices = np.array([price for _, price in room_types], dtype=np.float64)
+        rates = np.repeat(base_prices[:, None], self.horizon_days, axis=1)
+
+        # Later-starting seasons win where they overlap
+        for room_type_id, start_date, end_date, nightly_rate in seasons:
+            if room_type_id in rows:
+                start, end = self._span(epoch, start_date, end_date)
+                rates[rows[room_type_id], start:end] = nightly_rate
+
+        weekdays = (epoch.weekday() + np.arange(self.horizon_days)) % 7
+        los = np.zeros((len(room_types), MAX_LOS_NIGHTS + 1))
+        for room_type_id, weekend_multiplier, weekend_days, los_discounts in plans:
+            row = rows.get(room_type_id)
+            if row is None:
+                continue
+            rates[row, np.isin(weekdays, weekend_days or [])] *= weekend_multiplier
+            for min_nights, discount in sorted((int(n), d) for n, d in (los_discounts or {}).items()):
+                los[row, min(min_nights, MAX_LOS_NIGHTS):] = discount
+
+        cumulative = np.zeros((len(room_types), self.horizon_days + 1))
+        np.cumsum(rates, axis=1, out=cumulative[:, 1:])
+
+        with self._lock:
+            self._epoch = epoch
+            self._rows = rows
+            self._cumulative = cumulative
+            self._los = los
+            self.version += 1
+
+        logger.info("Rate engine built: %d room types, %d plans, %d seasons", len(room_types), len(plans), len(seasons))
+
+    def refresh(self):
+        db = SessionLocal()
+        try:
+            self.build(db)
+        finally:
+            db.close()
+
+    async def refresh_async(self):
+        """Rebuild from a route after a rate plan, season or room type price change"""
+        try:
+            await run_in_threadpool(self.refresh)
+        except Exception as e:
+            with self._lock:
+                self._epoch = None
+            logger.warning("Rate engine rebuild failed, falling back to base prices: %s", e)
+
+    # --------------------- CHANGE NOTIFICATIONS ---------------------
+    def mark_stale(self, table: Optional[str]):
+        """Table listener callback: a plan, season or base price changed, possibly in another worker"""
+        self._stale.set()
+
+    def sync(self):
+        """Rebuild if a change was notified since the last build"""
+        if not self._stale.is_set():
+            return
+        self._stale.clear()
+        try:
+            self.refresh()
+        except Exception:
+            self._stale.set()
+            raise
+
+    # --------------------- QUOTES ---------------------
+    def quote(self, room_type_ids: Sequence[int], check_ins: Sequence[date], check_outs: Sequence[date]) -> List[Optional[dict]]:
+        """Price many stays in one vectorized pass"""
+        count = len(room_type_ids)
+        with self._lock:
+            if self._epoch is None or self._epoch != date.today() or not self._rows:
+                return [None] * count
+
+            rows = np.array([self._rows.get(rt_id, -1) for rt_id in room_type_ids], dtype=np.int64)
+            starts = np.array([(ci - self._epoch).days for ci in check_ins], dtype=np.int64)
+            ends = np.array([(co - self._epoch).days for co in check_outs], dtype=np.int64)
+            valid = (rows >= 0) & (starts >= 0) & (ends <= self.horizon_days) & (starts < ends)
+
+            safe_rows = np.where(valid, rows, 0)
+            safe_starts = np.where(valid, starts, 0)
+            safe_ends = np.where(valid, ends, 0)
+            nights = safe_ends - safe_starts
+
+            subtotals = self._cumulative[safe_rows, safe_ends] - self._cumulative[safe_rows, safe_starts]
+            discounts = self._los[safe_rows, np.minimum(nights, MAX_LOS_NIGHTS)]
+
+        totals = np.rint(subtotals * (1 - discounts)).astype(np.int64)
+        subtotals = np.rint(subtotals).astype(np.int64)
+
+        return [
+            {
+                "nights": int(nights[i]),
+                "subtotal": int(subtotals[i]),
+                "discount": float(discounts[i]),
+                "total": int(totals[i])
+            } if valid[i] else None
+            for i in range(count)
+        ]
+
+    def nightly_rates(self, room_type_ids: Sequence[int], days: Sequence[date]) -> List[Optional[float]]:
+        """Rate of single nights (room type, day), vectorized; None where the engine cannot answer"""
+        count = len(room_type_ids)
+        with self._lock:
+            if self._epoch is None or self._epoch != date.today() or not self._rows:
+                return [None] * count
+
+            rows = np.array([self._rows.get(rt_id, -1) for rt_id in room_type_ids], dtype=np.int64)
+            offsets = np.array([(day - self._epoch).days for day in days], dtype=np.int64)
+            valid = (rows >= 0) & (offsets >= 0) & (offsets < self.horizon_days)
+
+            safe_rows = np.where(valid, rows, 0)
+            safe_offsets = np.where(valid, offsets, 0)
+            rates = self._cumulative[safe_rows, safe_offsets + 1] - self._cumulative[safe_rows, safe_offsets]
+
+        return [float(rates[i]) if valid[i] else None for i in range(count)]
+
+    def stay_total(self, room_type_id: int, check_in: date, check_out: date) -> Optional[int]:
+        quote = self.quote([room_type_id], [check_in], [check_out])[0]
+        return None if quote is None else quote["total"]
+
+    # --------------------- HELPERS ---------------------
+    def _span(self, epoch: date, start_date: date, end_date: date):
+        start = min(max((start_date - epoch).days, 0), self.horizon_days)
+        end = min(max((end_date - epoch).days, 0), self.horizon_days)
+        return start, end
+
+
+# Tables whose rows feed the rate table
+RATE_ENGINE_TABLES = {"rate_plans", "rate_seasons", "room_type_with_sizes"}
+
+rate_engine = RateEngine(horizon_days=settings.RATE_ENGINE_HORIZON_DAYS)
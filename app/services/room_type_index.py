@@ -0,0 +1,145 @@
+# app/services/room_type_index.py
+import logging
+import threading
+from typing import Iterable, List, Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.database_postgres import SessionLocal
+from app.models.associations import room_type_features
+from app.models.bed_type import BedTypes
+from app.models.features import Features
+from app.models.roomType_bedType import RoomTypeBedTypes
+from app.models.room_type import RoomTypeWithSizes
+
+logger = logging.getLogger(__name__)
+
+WORD_BITS = 64
+
+
+class RoomTypeIndex:
+    """
+    Per-process feature / bed type bitsets for room types.
+
+    Every Features and BedTypes row owns one bit; each room type keeps a row
+    of uint64 words with the bits of everything it offers. "Has all of X"
+    becomes `(masks & wanted) == wanted` over the whole table at once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._stale = threading.Event()
+        self._feature_bits: dict = {}
+        self._bed_type_bits: dict = {}
+        self._room_type_ids = np.zeros(0, dtype=np.int64)
+        self._masks = np.zeros((0, 1), dtype=np.uint64)
+
+    # --------------------- BUILD ---------------------
+    def build(self, db: Session):
+        feature_names = [name for (name,) in db.execute(select(Features.feature_name).order_by(Features.id))]
+        bed_type_names = [name for (name,) in db.execute(select(BedTypes.bed_type_name).order_by(BedTypes.id))]
+        room_type_ids = [rt_id for (rt_id,) in db.execute(select(RoomTypeWithSizes.id).order_by(RoomTypeWithSizes.id))]
+
+        feature_bits = {name: bit for bit, name in enumerate(feature_names)}
+        bed_type_bits = {name: len(feature_bits) + bit for bit, name in enumerate(bed_type_names)}
+        rows = {rt_id: row for row, rt_id in enumerate(room_type_ids)}
+
+        words = max(1, -(-(len(feature_bits) + len(bed_type_bits)) // WORD_BITS))
+        masks = np.zeros((len(room_type_ids), words), dtype=np.uint64)
+
+        feature_links = db.execute(
+            select(room_type_features.c.room_type_id, Features.feature_name)
+            .join(Features, Features.id == room_type_features.c.feature_id)
+        ).all()
+        bed_type_links = db.execute(
+            select(RoomTypeBedTypes.room_type_id, BedTypes.bed_type_name)
+            .join(BedTypes, BedTypes.id == RoomTypeBedTypes.bed_type_id)
+        ).all()
+
+        for room_type_id, name in feature_links:
+            self._set_bit(masks, rows.get(room_type_id), feature_bits[name])
+        for room_type_id, name in bed_type_links:
+            self._set_bit(masks, rows.get(room_type_id), bed_type_bits[name])
+
+        with self._lock:
+            self._feature_bits = feature_bits
+            self._bed_type_bits = bed_type_bits
+            self._room_type_ids = np.array(room_type_ids, dtype=np.int64)
+            self._masks = masks
+            self._built = True
+
+        logger.info(
+            "Room type index built: %d room types, %d features, %d bed types",
+            len(room_type_ids), len(feature_bits), len(bed_type_bits)
+        )
+
+    def refresh(self):
+        db = SessionLocal()
+        try:
+            self.build(db)
+        finally:
+            db.close()
+
+    async def refresh_async(self):
+        """Rebuild from a route after it committed a feature / bed type / room type change"""
+        try:
+            await run_in_threadpool(self.refresh)
+        except Exception as e:
+            with self._lock:
+                self._built = False
+            logger.warning("Room type index rebuild failed, falling back to SQL: %s", e)
+
+    # --------------------- CHANGE NOTIFICATIONS ---------------------
+    def mark_stale(self, table: Optional[str]):
+        """Table listener callback: another worker (or a script) changed a source table"""
+        self._stale.set()
+
+    def sync(self):
+        """Rebuild if a change was notified since the last build"""
+        if not self._stale.is_set():
+            return
+        self._stale.clear()
+        try:
+            self.refresh()
+        except Exception:
+            self._stale.set()
+            raise
+
+    # --------------------- QUERIES ---------------------
+    def room_types_with(self, features: Optional[List[str]] = None, bed_types: Optional[List[str]] = None) -> Optional[List[int]]:
+        """Room type ids offering every feature and bed type named, or None if the index cannot answer"""
+        with self._lock:
+            if not self._built:
+                return None
+            wanted = self._wanted(features or [], self._feature_bits)
+            wanted_beds = self._wanted(bed_types or [], self._bed_type_bits)
+            if wanted is None or wanted_beds is None:
+                # A name the index has not seen - possibly added by another worker
+                return None
+            wanted = np.bitwise_or(wanted, wanted_beds)
+            matched = np.all((self._masks & wanted) == wanted, axis=1)
+            return self._room_type_ids[matched].tolist()
+
+    # --------------------- HELPERS ---------------------
+    def _wanted(self, names: Iterable[str], bits: dict) -> Optional[np.ndarray]:
+        wanted = np.zeros(self._masks.shape[1], dtype=np.uint64)
+        for name in names:
+            bit = bits.get(name)
+            if bit is None:
+                return None
+            wanted[bit // WORD_BITS] |= np.uint64(1) << np.uint64(bit % WORD_BITS)
+        return wanted
+
+    @staticmethod
+    def _set_bit(masks: np.ndarray, row: Optional[int], bit: int):
+        if row is None:
+            return
+        masks[row, bit // WORD_BITS] |= np.uint64(1) << np.uint64(bit % WORD_BITS)
+
+
+# Tables whose rows end up in the bitsets
+ROOM_TYPE_INDEX_TABLES = {"room_type_features", "room_type_bed_types", "features", "bed_types", "room_type_with_sizes"}
+
+room_type_index = RoomTypeIndex()
@@ -0,0 +1,86 @@
+# app/services/search_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Searched table -> tables whose rows end up in its search_text / search_vector
+# or in the serialized results, so a change to any of them evicts its entries
+SEARCH_DEPENDENCIES = {
+    "rooms": {"rooms", "room_type_with_sizes", "floors", "features", "bed_types", "room_type_features", "room_type_bed_types"},
+    "room_type_with_sizes": {"room_type_with_sizes", "features", "bed_types", "room_type_features", "room_type_bed_types"},
+    "bookings": {"bookings", "rooms", "room_type_with_sizes", "floors", "features", "bed_types", "users", "profiles", "roles"},
+    "floors": {"floors"},
+    "features": {"features"},
+    "addons": {"addons"},
+    "bed_types": {"bed_types"},
+    "users": {"users", "profiles", "roles"},
+}
+
+WATCHED_TABLES = set().union(*SEARCH_DEPENDENCIES.values())
+
+
+class SearchCache:
+    """
+    Per-process LRU + TTL cache of serialized search results.
+
+    Keys start with the searched table; `invalidate(table)` drops every entry
+    whose table depends on the changed one. The TTL bounds staleness when
+    change notifications are unavailable.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._affected = {
+            table: {searched for searched, deps in SEARCH_DEPENDENCIES.items() if table in deps}
+            for table in WATCHED_TABLES
+        }
+
+    @staticmethod
+    def key(table: str, q: str, *args) -> tuple:
+        return (table, " ".join(q.lower().split()), *args)
+
+    def get(self, key: tuple) -> Optional[list]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, results = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return results
+
+    def put(self, key: tuple, results: list):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table: Optional[str]):
+        """Listener callback: None means notifications may have been missed"""
+        if table is None:
+            self.clear()
+            return
+        affected = self._affected.get(table, {table})
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in affected]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+search_cache = SearchCache(
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS
+)
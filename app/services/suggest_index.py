@@ -0,0 +1,163 @@
+# app/services/suggest_index.py
+import logging
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import List, Optional
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.database_postgres import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"[a-z0-9]+")
+MIN_TERM_LENGTH = 2
+
+# Source table -> (search_text, popularity) per row; each row adds its popularity to every distinct term it holds
+SUGGEST_SOURCES = {
+    "rooms": """
+        SELECT r.search_text, 1 + count(b.id)
+        FROM rooms r
+        LEFT JOIN bookings b ON b.room_id = r.id
+        GROUP BY r.id
+    """,
+    "room_type_with_sizes": """
+        SELECT rts.search_text, 1 + count(b.id)
+        FROM room_type_with_sizes rts
+        LEFT JOIN rooms r ON r.room_type_id = rts.id
+        LEFT JOIN bookings b ON b.room_id = r.id
+        GROUP BY rts.id
+    """,
+    "features": """
+        SELECT f.search_text, 1 + count(rtf.room_type_id)
+        FROM features f
+        LEFT JOIN room_type_features rtf ON rtf.feature_id = f.id
+        GROUP BY f.id
+    """,
+    "addons": """
+        SELECT a.search_text, 1 + coalesce(sum(ba.quantity), 0)
+        FROM addons a
+        LEFT JOIN booking_addons ba ON ba.addon_id = a.id
+        GROUP BY a.id
+    """,
+}
+
+
+class SuggestIndex:
+    """
+    Per-process typeahead index.
+
+    Terms are kept in one sorted list with a parallel popularity array, so a
+    prefix is a contiguous slice found by two bisects and the top-k of that
+    slice is an argpartition. Term counts are kept per source table, so a
+    change notification only re-reads the table that changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Serializes builds: the periodic refresh and sync both rewrite _table_terms
+        self._build_lock = threading.Lock()
+        self._built = False
+        self._dirty: set = set()
+        self._table_terms = {table: Counter() for table in SUGGEST_SOURCES}
+        self._terms: List[str] = []
+        self._popularity = np.zeros(0, dtype=np.int64)
+
+    # --------------------- BUILD ---------------------
+    def build(self, db: Session, tables=None):
+        tables = list(tables or SUGGEST_SOURCES)
+        with self._build_lock:
+            for table in tables:
+                terms = Counter()
+                for search_text, popularity in db.execute(text(SUGGEST_SOURCES[table])):
+                    for term in set(TOKEN.findall((search_text or "").lower())):
+                        if len(term) >= MIN_TERM_LENGTH:
+                            terms[term] += popularity
+                self._table_terms[table] = terms
+
+            merged = Counter()
+            for terms in self._table_terms.values():
+                merged.update(terms)
+            ordered = sorted(merged)
+            popularity = np.array([merged[term] for term in ordered], dtype=np.int64)
+
+            with self._lock:
+                self._terms = ordered
+                self._popularity = popularity
+                self._built = True
+
+        logger.info("Suggest index built: %d terms (%s)", len(ordered), ", ".join(tables))
+
+    def refresh(self):
+        """Full rebuild; also the only place popularity picks up new bookings"""
+        db = SessionLocal()
+        try:
+            with self._lock:
+                self._dirty.clear()
+            self.build(db)
+        finally:
+            db.close()
+
+    # --------------------- INCREMENTAL UPDATES ---------------------
+    def mark_dirty(self, table: Optional[str]):
+        """Table listener callback; None means every source may have changed"""
+        with self._lock:
+            if table is None:
+                self._dirty.update(SUGGEST_SOURCES)
+            elif table in SUGGEST_SOURCES:
+                self._dirty.add(table)
+
+    def sync(self):
+        """Re-read only the source tables changed since the last sync"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        db = SessionLocal()
+        try:
+            self.build(db, dirty)
+        except Exception:
+            with self._lock:
+                self._dirty.update(dirty)
+            raise
+        finally:
+            db.close()
+
+    # --------------------- QUERIES ---------------------
+    def suggest(self, q: str, limit: int) -> Optional[List[dict]]:
+        """Top completions of the last word of q by popularity, or None if the index is not built"""
+        words = TOKEN.findall(q.lower())
+        if not words:
+            return []
+        lead, prefix = " ".join(words[:-1]), words[-1]
+
+        with self._lock:
+            if not self._built:
+                return None
+            lo = bisect_left(self._terms, prefix)
+            hi = bisect_left(self._terms, prefix + "\uffff", lo)
+            popularity = self._popularity[lo:hi]
+            if len(popularity) > limit:
+                top = np.argpartition(-popularity, limit - 1)[:limit]
+            else:
+                top = np.arange(len(popularity))
+            matches = [(self._terms[lo + i], int(popularity[i])) for i in top]
+
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return [
+            {"text": f"{lead} {term}".strip(), "term": term, "popularity": popularity}
+            for term, popularity in matches
+        ]
+
+    def popular_terms(self, limit: int) -> List[str]:
+        """Most popular terms overall, e.g. as sample queries for search tuning"""
+        with self._lock:
+            if len(self._popularity) > limit:
+                top = np.argpartition(-self._popularity, limit - 1)[:limit]
+            else:
+                top = np.arange(len(self._popularity))
+            return [self._terms[i] for i in top[np.argsort(-self._popularity[top], kind="stable")]]
+
+suggest_index = SuggestIndex()